@@ -0,0 +1,90 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'plox'))
+
+from RegexScanner import RegexScanner
+from Parser import Parser
+from Resolver import Resolver
+from AstArena import AstArena, ArenaParser
+from ArenaResolver import ArenaResolver
+from BenchScanner import BenchScanner
+
+# Loads (parses and resolves) a large generated script into Expr/Stmt nodes
+# and into an AstArena, reporting the memory each representation keeps
+# alive, the time the cyclic GC spent while loading and the pause of one
+# full collection afterwards.
+class BenchArena:
+    pauses = []
+    started = 0.0
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchArena.py [-f script] [-n functions]")
+        parser.add_argument('-f', type=str, help="Load this file instead of a generated one")
+        parser.add_argument('-n', type=int, default=20000, help="Number of functions in the generated source")
+        args = parser.parse_args()
+
+        if args.f:
+            source = Path(args.f).read_text()
+        else:
+            source = BenchScanner.generate(args.n)
+        sys.setrecursionlimit(10000)
+        tokens = RegexScanner(source).scanTokens()
+        print("source: " + str(round(len(source) / 1e6, 2)) + " MB, " + str(len(tokens)) + " tokens")
+
+        gc.callbacks.append(BenchArena.track)
+        for name, load in (("nodes", BenchArena.loadNodes), ("arena", BenchArena.loadArena)):
+            gc.collect()
+            tracemalloc.start()
+            program = load(tokens)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del program
+
+            gc.collect()
+            BenchArena.pauses = []
+            start = time.perf_counter()
+            program = load(tokens)
+            elapsed = time.perf_counter() - start
+            collections = len(BenchArena.pauses)
+            paused = sum(BenchArena.pauses)
+
+            start = time.perf_counter()
+            gc.collect()
+            full = time.perf_counter() - start
+
+            print(name.ljust(6) + " load " + str(round(elapsed, 3)).rjust(6) + " s  " +
+                  str(round(memory / 1e6, 1)).rjust(6) + " MB  gc " + str(collections).rjust(4) + " runs " +
+                  str(round(paused * 1e3, 1)).rjust(7) + " ms  full collection " +
+                  str(round(full * 1e3, 1)).rjust(6) + " ms")
+            del program
+        gc.callbacks.remove(BenchArena.track)
+
+    @staticmethod
+    def track(phase, info):
+        if phase == "start":
+            BenchArena.started = time.perf_counter()
+        else:
+            BenchArena.pauses.append(time.perf_counter() - BenchArena.started)
+
+    @staticmethod
+    def loadNodes(tokens):
+        statements = Parser(tokens).parse()
+        Resolver().resolveStmts(statements)
+        return statements
+
+    @staticmethod
+    def loadArena(tokens):
+        arena = AstArena()
+        statements = ArenaParser(tokens, arena).parse()
+        ArenaResolver(arena).resolveStmts(statements)
+        return arena, statements
+
+
+if __name__ == '__main__':
+    BenchArena.main()
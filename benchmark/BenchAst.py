@@ -0,0 +1,86 @@
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'plox'))
+
+from BenchScanner import BenchScanner
+
+# Compares the plain and the --slots output of tool/GenerateAst.py. Each
+# variant is generated into a temporary directory and measured in its own
+# process, which imports the node classes from there instead of plox/.
+class BenchAst:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchAst.py [-n functions]")
+        parser.add_argument('-n', type=int, default=20000, help="Number of functions in the generated source")
+        parser.add_argument('--nodes', type=str, help=argparse.SUPPRESS)
+        args = parser.parse_args()
+
+        if args.nodes:
+            BenchAst.measure(args.nodes, args.n)
+            return
+
+        print("generated source: " + str(args.n) + " functions")
+        with tempfile.TemporaryDirectory() as temp:
+            for variant, slots in (("plain", False), ("slots", True)):
+                outputDir = Path(temp) / variant
+                outputDir.mkdir()
+                generate = [sys.executable, str(ROOT / 'tool' / 'GenerateAst.py'), str(outputDir)]
+                if slots:
+                    generate.append('--slots')
+                subprocess.run(generate, check=True)
+
+                output = subprocess.run([sys.executable, __file__, '-n', str(args.n), '--nodes', str(outputDir)],
+                                        check=True, capture_output=True, text=True).stdout
+                result = json.loads(output)
+                print(variant.ljust(6) + " tree " + str(round(result["memory"] / 1e6, 1)).rjust(6) + " MB  " +
+                      str(round(result["memory"] / result["nodes"], 1)).rjust(6) + " bytes/node  parse " +
+                      str(round(result["parse"], 3)).rjust(6) + " s  interpret " +
+                      str(round(result["interpret"], 3)).rjust(6) + " s")
+
+    @staticmethod
+    def measure(nodesDir: str, count: int):
+        sys.path.insert(0, nodesDir)
+        from RegexScanner import RegexScanner
+        from Parser import Parser
+        from Resolver import Resolver
+        from Interpreter import Interpreter
+        from Optimizer import NodeCounter
+
+        tokens = RegexScanner(BenchScanner.generate(count)).scanTokens()
+
+        tracemalloc.start()
+        statements = Parser(tokens).parse()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        statements = Parser(tokens).parse()
+        parse = time.perf_counter() - start
+
+        Resolver().resolveStmts(statements)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Interpreter().interpret(statements)
+        interpret = time.perf_counter() - start
+
+        print(json.dumps({
+            "nodes": NodeCounter().countAll(statements),
+            "memory": memory,
+            "parse": parse,
+            "interpret": interpret,
+        }))
+
+
+if __name__ == '__main__':
+    BenchAst.main()
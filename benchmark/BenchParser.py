@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'plox'))
+
+from RegexScanner import RegexScanner
+from Parser import Parser
+from BenchScanner import BenchScanner
+
+class BenchParser:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchParser.py [-f script] [-n functions] [-r repeat]")
+        parser.add_argument('-f', type=str, help="Parse this file instead of a generated one")
+        parser.add_argument('-n', type=int, default=10000, help="Number of functions in the generated source")
+        parser.add_argument('-r', type=int, default=3, help="Number of timed runs, the best one is reported")
+        args = parser.parse_args()
+
+        if args.f:
+            source = Path(args.f).read_text()
+        else:
+            source = BenchScanner.generate(args.n)
+        tokens = RegexScanner(source).scanTokens()
+
+        best = None
+        for i in range(args.r):
+            start = time.perf_counter()
+            statements = Parser(tokens).parse()
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+
+        print("parsed " + str(len(tokens)) + " tokens into " + str(len(statements)) + " statements")
+        print("best of " + str(args.r) + ": " + str(round(best, 3)) + " s, " +
+              str(round(len(tokens) / best / 1e3)) + "k tokens/s")
+
+
+if __name__ == '__main__':
+    BenchParser.main()
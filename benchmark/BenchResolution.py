@@ -0,0 +1,41 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'plox'))
+
+from Token import Token, TokenType
+from Expr import Variable
+from Environment import Environment
+from Interpreter import Interpreter
+
+class BenchResolution:
+
+    @staticmethod
+    def main():
+        number = 1000000
+        name = Token(TokenType.IDENTIFIER, "a", None, 1)
+        expr = Variable(name)
+        expr.depth = 1
+        expr.slot = 0
+
+        interpreter = Interpreter()
+        interpreter.environment = Environment(Environment(None, [1.0]))
+
+        # The previous scheme: depths stored under str(expr) in a side table.
+        local_scope = {str(expr): 1}
+        strKeyed = timeit.timeit(lambda: local_scope[str(expr)], number=number)
+        attribute = timeit.timeit(lambda: expr.depth, number=number)
+        read = timeit.timeit(lambda: interpreter.visitVariableExpr(expr), number=number)
+
+        print("str(expr)-keyed lookup: " + BenchResolution.perOp(strKeyed, number))
+        print("node attribute lookup:  " + BenchResolution.perOp(attribute, number))
+        print("local variable read:    " + BenchResolution.perOp(read, number))
+
+    @staticmethod
+    def perOp(seconds: float, number: int):
+        return str(round(seconds / number * 1e9, 1)) + " ns/read"
+
+
+if __name__ == '__main__':
+    BenchResolution.main()
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'plox'))
+
+from Scanner import Scanner
+from RegexScanner import RegexScanner
+
+class BenchScanner:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchScanner.py [-f script] [-n functions]")
+        parser.add_argument('-f', type=str, help="Scan this file instead of a generated one")
+        parser.add_argument('-n', type=int, default=20000, help="Number of functions in the generated source")
+        args = parser.parse_args()
+
+        if args.f:
+            source = Path(args.f).read_text()
+        else:
+            source = BenchScanner.generate(args.n)
+        print("source: " + str(round(len(source) / 1e6, 2)) + " MB")
+
+        results = []
+        for scanner in (Scanner, RegexScanner):
+            start = time.perf_counter()
+            tokens = scanner(source).scanTokens()
+            elapsed = time.perf_counter() - start
+            results.append(tokens)
+            print(scanner.__name__.ljust(13) + str(round(elapsed, 3)).rjust(8) + " s  " +
+                  str(round(len(source) / elapsed / 1e6, 2)).rjust(6) + " MB/s  " + str(len(tokens)) + " tokens")
+
+        tracemalloc.start()
+        tokens = RegexScanner(source).scanTokens()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("token stream: " + str(round(size / 1e6, 1)) + " MB, " + str(round(size / len(tokens), 1)) + " bytes/token")
+
+        if BenchScanner.key(results[0]) != BenchScanner.key(results[1]):
+            raise SystemExit("Token streams differ")
+
+    @staticmethod
+    def key(tokens):
+        return [(token.type, token.lexeme, token.literal, token.line) for token in tokens]
+
+    @staticmethod
+    def generate(count: int):
+        lines = []
+        for i in range(count):
+            lines.append("// function number " + str(i))
+            lines.append("fun work" + str(i) + "(a, b) {")
+            lines.append("  var total = a * " + str(i) + ".5 + b;")
+            lines.append("  if (total >= 10 and !(a == b)) {")
+            lines.append("    print \"result:\" + \"multi")
+            lines.append("line\";")
+            lines.append("  }")
+            lines.append("  for (var i = 0; i < 3; i = i + 1) total = total - i / 2;")
+            lines.append("  return total != nil or false;")
+            lines.append("}")
+            lines.append("work" + str(i) + "(1, 2);")
+        return "\n".join(lines) + "\n"
+
+
+if __name__ == '__main__':
+    BenchScanner.main()
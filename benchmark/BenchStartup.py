@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PLOX = Path(__file__).resolve().parent.parent / 'plox'
+SCRIPT = Path(__file__).resolve().parent.parent / 'test_code' / 'variables.lox'
+
+# Command lines timed from a fresh process, run from the plox directory.
+# "python" is the bare interpreter startup every other mode pays too.
+MODES = {
+    'python': ['-c', 'pass'],
+    'cached': ['Lox.py', '-f', '{script}'],
+    'no-cache': ['Lox.py', '--no-cache', '-f', '{script}'],
+    'vm': ['Lox.py', '-b', 'vm', '-f', '{script}'],
+}
+
+# Starts are timed with up to date bytecode caches, as users get them
+ENVIRONMENT = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+
+# Times cold starts of Lox.py, each run a new Python process, and breaks
+# the imports of one run down with -X importtime. The target applies to the
+# startup overhead of the default "cached" mode over a bare interpreter,
+# which is less machine dependent than the total; a run above it, or with a
+# best time more than the threshold slower than a saved baseline, exits
+# with status 1.
+class BenchStartup:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchStartup.py [-f script] [-r repeat] [--target ms] [--save file] [--baseline file]")
+        parser.add_argument('-f', type=str, default=str(SCRIPT), help="Script to start")
+        parser.add_argument('-r', type=int, default=20, help="Number of timed starts of each mode")
+        parser.add_argument('-m', type=str, nargs='*', choices=list(MODES), help="Only time these modes")
+        parser.add_argument('--top', type=int, default=15, help="Number of modules in the import breakdown, 0 to skip it")
+        parser.add_argument('--target', type=float, default=20.0, help="Milliseconds the best cached start may take over a bare python start")
+        parser.add_argument('--save', type=str, help="Write the results to this baseline file")
+        parser.add_argument('--baseline', type=str, help="Compare the results with this baseline file")
+        parser.add_argument('--threshold', type=float, default=10.0, help="Percent a best time may exceed the baseline before it is a regression")
+        args = parser.parse_args()
+        if args.r < 2:
+            parser.error("-r must be at least 2 to measure variance")
+
+        script = str(Path(args.f).resolve())
+        modes = {name: [arg.format(script=script) for arg in command] for name, command in MODES.items()
+                 if not args.m or name in args.m or name == 'python'}
+        # Write the bytecode caches and fill the AST cache so "cached" measures a hit
+        for command in modes.values():
+            BenchStartup.start(command)
+
+        baseline = None
+        if args.baseline:
+            data = json.loads(Path(args.baseline).read_text())
+            baseline = data["results"] if data["script"] == Path(script).name else {}
+
+        results = {}
+        regressions = []
+        print("mode".ljust(12) + "best ms".rjust(10) + "median".rjust(10) + "stdev".rjust(9) + "overhead".rjust(10) +
+              ("  vs baseline" if baseline else ""))
+        for name, command in modes.items():
+            times = [BenchStartup.start(command) for i in range(args.r)]
+            results[name] = {"best": min(times), "median": statistics.median(times), "stdev": statistics.stdev(times)}
+
+        python = results['python']["best"]
+        for name, result in results.items():
+            line = (name.ljust(12) + str(round(result["best"] * 1e3, 2)).rjust(10) +
+                    str(round(result["median"] * 1e3, 2)).rjust(10) + str(round(result["stdev"] * 1e3, 2)).rjust(9) +
+                    ("+" + str(round((result["best"] - python) * 1e3, 2))).rjust(10))
+            if baseline and name in baseline:
+                change = result["best"] / baseline[name]["best"] - 1
+                line += (("+" if change >= 0 else "") + str(round(change * 100, 1)) + "%").rjust(15)
+                if change * 100 > args.threshold:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line)
+
+        if args.top > 0 and 'cached' in modes:
+            BenchStartup.breakdown(modes['cached'], args.top)
+
+        if args.save:
+            data = {"python": platform.python_version(), "script": Path(script).name, "repeat": args.r, "results": results}
+            Path(args.save).write_text(json.dumps(data, indent=2) + "\n")
+            print("saved baseline to " + args.save)
+
+        failures = []
+        if 'cached' in results:
+            overhead = (results['cached']["best"] - python) * 1e3
+            print("cached start overhead " + str(round(overhead, 2)) + " ms, target " + str(args.target) + " ms")
+            if overhead > args.target:
+                failures.append("cached start over the " + str(args.target) + " ms target")
+        if regressions:
+            failures.append(str(len(regressions)) + " regressions over " + str(args.threshold) + "%: " + ", ".join(regressions))
+        if failures:
+            raise SystemExit("; ".join(failures))
+
+    # Wall time of one fresh process running the command
+    @staticmethod
+    def start(command):
+        begin = time.perf_counter()
+        completed = subprocess.run([sys.executable] + command, cwd=PLOX, env=ENVIRONMENT,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - begin
+        if completed.returncode != 0:
+            raise SystemExit("Failed to start: " + " ".join(command))
+        return elapsed
+
+    # Prints the modules with the largest own import time in one run under
+    # -X importtime, and the totals of the plox modules and everything else
+    @staticmethod
+    def breakdown(command, top: int):
+        completed = subprocess.run([sys.executable, '-X', 'importtime'] + command, cwd=PLOX, env=ENVIRONMENT,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        local = {path.stem for path in PLOX.glob('*.py')}
+        imports = []
+        for line in completed.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split('|')
+            imports.append((int(own), int(cumulative), name.strip()))
+
+        totals = {"plox": 0, "other": 0}
+        for own, cumulative, name in imports:
+            totals["plox" if name in local else "other"] += own
+        print()
+        print("module".ljust(24) + "self ms".rjust(10) + "cumulative".rjust(12))
+        for own, cumulative, name in sorted(imports, reverse=True)[:top]:
+            print(name.ljust(24) + str(round(own / 1e3, 2)).rjust(10) + str(round(cumulative / 1e3, 2)).rjust(12))
+        print(str(len(imports)) + " modules imported, plox " + str(round(totals["plox"] / 1e3, 2)) +
+              " ms, other " + str(round(totals["other"] / 1e3, 2)) + " ms")
+
+
+if __name__ == '__main__':
+    BenchStartup.main()
@@ -0,0 +1,170 @@
+import argparse
+import gc
+import hashlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'plox'))
+
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+from BenchScanner import BenchScanner
+
+STAGES = ('scan', 'parse', 'resolve', 'interpret')
+
+# Times each stage of the tree interpreter pipeline over the corpus/*.lox
+# programs and a large generated source, reporting the mean, the spread of
+# the timed runs and the peak memory each stage allocates. Results can be
+# saved as a JSON baseline and later runs compared against it. Comparisons
+# use the best run, which is much less noisy than the mean; a stage slower
+# than the baseline by more than the threshold is reported as a regression
+# and makes the run exit with status 1.
+class BenchSuite:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python BenchSuite.py [-r repeat] [--save file] [--baseline file]")
+        parser.add_argument('-d', type=str, default=str(Path(__file__).resolve().parent / 'corpus'), help="Directory of .lox programs to run")
+        parser.add_argument('-p', type=str, nargs='*', help="Only run the programs with these names")
+        parser.add_argument('-n', type=int, default=2000, help="Number of functions in the generated program, 0 to skip it")
+        parser.add_argument('-r', type=int, default=5, help="Number of timed runs of each program")
+        parser.add_argument('-w', type=int, default=1, help="Number of untimed warmup runs of each program")
+        parser.add_argument('--save', type=str, help="Write the results to this baseline file")
+        parser.add_argument('--baseline', type=str, help="Compare the results with this baseline file")
+        parser.add_argument('--threshold', type=float, default=10.0, help="Percent a best time may exceed the baseline before it is a regression")
+        args = parser.parse_args()
+        if args.r < 2:
+            parser.error("-r must be at least 2 to measure variance")
+
+        programs = {}
+        for path in sorted(Path(args.d).glob('*.lox')):
+            programs[path.stem] = path.read_text()
+        if args.n > 0:
+            programs["generated"] = BenchScanner.generate(args.n)
+        if args.p:
+            programs = {name: source for name, source in programs.items() if name in args.p}
+        if not programs:
+            raise SystemExit("No programs to run")
+
+        sources = {name: hashlib.sha256(source.encode()).hexdigest()[:16] for name, source in programs.items()}
+        baseline = None
+        if args.baseline:
+            data = json.loads(Path(args.baseline).read_text())
+            # Only programs whose source is unchanged are comparable
+            baseline = {name: stages for name, stages in data["results"].items()
+                        if data["sources"].get(name) == sources.get(name)}
+
+        results = {}
+        regressions = []
+        print("program".ljust(12) + "stage".ljust(11) + "mean ms".rjust(10) + "stdev".rjust(9) +
+              "ops/s".rjust(10) + "peak KB".rjust(10) + ("  vs baseline" if baseline else ""))
+        for name, source in programs.items():
+            results[name] = BenchSuite.measure(source, args.r, args.w)
+            for stage in STAGES:
+                result = results[name][stage]
+                line = (name.ljust(12) + stage.ljust(11) + str(round(result["mean"] * 1e3, 2)).rjust(10) +
+                        ("±" + str(round(result["stdev"] / result["mean"] * 100, 1)) + "%").rjust(9) +
+                        str(round(1 / result["mean"], 1)).rjust(10) + str(round(result["peak"] / 1e3, 1)).rjust(10))
+                if baseline and name in baseline and stage in baseline[name]:
+                    change = result["best"] / baseline[name][stage]["best"] - 1
+                    line += (("+" if change >= 0 else "") + str(round(change * 100, 1)) + "%").rjust(15)
+                    if change * 100 > args.threshold:
+                        line += "  REGRESSION"
+                        regressions.append(name + " " + stage)
+                print(line)
+
+        if args.save:
+            data = {"python": platform.python_version(), "repeat": args.r, "sources": sources, "results": results}
+            Path(args.save).write_text(json.dumps(data, indent=2) + "\n")
+            print("saved baseline to " + args.save)
+        if regressions:
+            raise SystemExit(str(len(regressions)) + " regressions over " + str(args.threshold) + "%: " + ", ".join(regressions))
+
+    # Runs the whole pipeline repeat times on fresh trees and returns the
+    # mean, standard deviation and best time of each stage, plus its peak
+    # memory from one more run under tracemalloc, which would distort the
+    # timings.
+    @staticmethod
+    def measure(source: str, repeat: int, warmup: int):
+        for i in range(warmup):
+            BenchSuite.run(source, time.perf_counter, BenchSuite.elapsed)
+
+        times = {stage: [] for stage in STAGES}
+        for i in range(repeat):
+            gc.collect()
+            for stage, elapsed in BenchSuite.run(source, time.perf_counter, BenchSuite.elapsed).items():
+                times[stage].append(elapsed)
+
+        gc.collect()
+        tracemalloc.start()
+        peaks = BenchSuite.run(source, BenchSuite.startTrace, BenchSuite.peak)
+        tracemalloc.stop()
+
+        results = {}
+        for stage in STAGES:
+            results[stage] = {
+                "mean": statistics.mean(times[stage]),
+                "stdev": statistics.stdev(times[stage]),
+                "best": min(times[stage]),
+                "peak": peaks[stage],
+            }
+        return results
+
+    @staticmethod
+    def elapsed(start: float):
+        return time.perf_counter() - start
+
+    # Returns the traced memory in use and starts tracking a new peak
+    @staticmethod
+    def startTrace():
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    # Memory allocated at the peak since startTrace returned current
+    @staticmethod
+    def peak(current: int):
+        return tracemalloc.get_traced_memory()[1] - current
+
+    # Runs each stage once and returns stop(start()) around each of them,
+    # the elapsed time or the peak memory of the stage.
+    @staticmethod
+    def run(source: str, start, stop):
+        results = {}
+
+        begin = start()
+        tokens = Scanner(source).scanTokens()
+        results['scan'] = stop(begin)
+
+        begin = start()
+        parser = Parser(tokens)
+        statements = parser.parse()
+        results['parse'] = stop(begin)
+        if parser.hadError:
+            raise SystemExit("Benchmark program failed to parse")
+
+        begin = start()
+        resolver = Resolver()
+        resolver.resolveStmts(statements)
+        results['resolve'] = stop(begin)
+        if resolver.hadError:
+            raise SystemExit("Benchmark program failed to resolve")
+
+        interpreter = Interpreter(io.StringIO())
+        begin = start()
+        interpreter.interpret(statements)
+        results['interpret'] = stop(begin)
+        if interpreter.hadRuntimeError:
+            raise SystemExit("Benchmark program failed to run")
+        return results
+
+
+if __name__ == '__main__':
+    BenchSuite.main()
@@ -0,0 +1,190 @@
+from Token import TokenType
+from Environment import Environment
+from RuntimeErr import RuntimeErr
+from LoxCallable import LoxCallable
+from Natives import NativeError
+from Completion import RETURNED, TAIL_CALL
+from Interpreter import Interpreter
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
+from AstArena import AstArena, NONE
+from AstSerializer import ASSIGN, BINARY, CALL, GROUPING, LITERAL, LOGICAL, UNARY, VARIABLE, \
+    BLOCK, EXPRESSION, FUNCTION, IF, PRINT, RETURN, VAR, WHILE
+
+class ArenaFunction(LoxCallable):
+    def __init__(self, arena: AstArena, declaration: int, closure: Environment):
+        self.declaration = declaration
+        self.closure = closure
+        self.name = arena.tokens[arena.token[declaration]]
+        self.params = arena.first[declaration]
+        self.body = arena.body(declaration)
+
+    def call(self, interpreter, arguments):
+        function = self
+        while True:
+            environment = Environment(function.closure, list(arguments))
+            status = interpreter.executeBlock(function.body, environment)
+            if status == TAIL_CALL:
+                function = interpreter.tailFunction
+                arguments = interpreter.tailArguments
+                continue
+            if status == RETURNED:
+                return interpreter.returnValue
+            return None
+
+    def arity(self):
+        return self.params
+
+    def __str__(self):
+        return "<fn " + self.name.lexeme + ">"
+
+# Tree-walking interpreter over AstArena handles resolved by ArenaResolver.
+# Globals, truthiness, stringify and executeBlock are shared with Interpreter.
+class ArenaInterpreter(Interpreter):
+    def __init__(self, arena: AstArena, output=None):
+        super().__init__(output)
+        self.arena = arena
+        self.kind = arena.kind
+        self.first = arena.first
+        self.second = arena.second
+        self.third = arena.third
+        # Indexed by node kind, which are the consecutive AstSerializer tags
+        self.handlers = [None] * (WHILE + 1)
+        self.handlers[ASSIGN] = self.assign
+        self.handlers[BINARY] = self.binary
+        self.handlers[CALL] = self.call
+        self.handlers[GROUPING] = self.grouping
+        self.handlers[LITERAL] = self.literal
+        self.handlers[LOGICAL] = self.logical
+        self.handlers[UNARY] = self.unary
+        self.handlers[VARIABLE] = self.variable
+        self.handlers[BLOCK] = self.block
+        self.handlers[EXPRESSION] = self.expression
+        self.handlers[FUNCTION] = self.function
+        self.handlers[IF] = self.ifStmt
+        self.handlers[PRINT] = self.printStmt
+        self.handlers[RETURN] = self.returnStmt
+        self.handlers[VAR] = self.var
+        self.handlers[WHILE] = self.whileStmt
+
+    def evaluate(self, node: int):
+        return self.handlers[self.kind[node]](node)
+
+    def execute(self, node: int):
+        return self.handlers[self.kind[node]](node)
+
+    def token(self, node: int):
+        return self.arena.tokens[self.arena.token[node]]
+
+    def assign(self, node: int):
+        value = self.evaluate(self.first[node])
+
+        depth = self.second[node]
+        if depth == NONE:
+            self.global_scope.assign(self.token(node), value)
+        else:
+            self.environment.assignAt(depth, self.third[node], value)
+
+        return value
+
+    def binary(self, node: int):
+        operator = self.token(node)
+        left = self.evaluate(self.first[node])
+        right = self.evaluate(self.second[node])
+        return BINARY_OPERATORS[operator.type](operator, left, right)
+
+    def call(self, node: int):
+        callee = self.evaluate(self.first[node])
+
+        arguments = []
+        for argument in self.arena.list(self.second[node], self.third[node]):
+            arguments.append(self.evaluate(argument))
+
+        self.checkCall(callee, arguments, self.token(node))
+        try:
+            return callee.call(self, arguments)
+        except NativeError as err:
+            raise RuntimeErr(self.token(node), err.message)
+
+    def grouping(self, node: int):
+        return self.evaluate(self.first[node])
+
+    def literal(self, node: int):
+        return self.arena.constants[self.first[node]]
+
+    def logical(self, node: int):
+        left = self.evaluate(self.first[node])
+
+        if self.token(node).type == TokenType.OR:
+            if self.isTruthy(left):
+                return left
+        else:
+            if not self.isTruthy(left):
+                return left
+
+        return self.evaluate(self.second[node])
+
+    def unary(self, node: int):
+        operator = self.token(node)
+        return UNARY_OPERATORS[operator.type](operator, self.evaluate(self.first[node]))
+
+    def variable(self, node: int):
+        depth = self.second[node]
+        if depth == NONE:
+            return self.global_scope.get(self.token(node))
+        return self.environment.getAt(depth, self.third[node])
+
+    def block(self, node: int):
+        return self.executeBlock(self.arena.list(self.second[node], self.third[node]), Environment(self.environment))
+
+    def expression(self, node: int):
+        self.evaluate(self.first[node])
+
+    def function(self, node: int):
+        function = ArenaFunction(self.arena, node, self.environment)
+        self.environment.define(function.name.lexeme, function)
+
+    def ifStmt(self, node: int):
+        if self.isTruthy(self.evaluate(self.first[node])):
+            return self.execute(self.second[node])
+        elif self.third[node] != NONE:
+            return self.execute(self.third[node])
+
+    def printStmt(self, node: int):
+        value = self.evaluate(self.first[node])
+        print(self.stringify(value), file=self.output)
+
+    def returnStmt(self, node: int):
+        value = None
+        expr = self.first[node]
+        if expr != NONE and self.kind[expr] == CALL:
+            callee = self.evaluate(self.first[expr])
+            arguments = [self.evaluate(argument) for argument in self.arena.list(self.second[expr], self.third[expr])]
+            self.checkCall(callee, arguments, self.token(expr))
+            if type(callee) is ArenaFunction:
+                self.tailFunction = callee
+                self.tailArguments = arguments
+                return TAIL_CALL
+            try:
+                value = callee.call(self, arguments)
+            except NativeError as err:
+                raise RuntimeErr(self.token(expr), err.message)
+        elif expr != NONE:
+            value = self.evaluate(expr)
+
+        self.returnValue = value
+        return RETURNED
+
+    def var(self, node: int):
+        value = None
+        if self.first[node] != NONE:
+            value = self.evaluate(self.first[node])
+
+        self.environment.define(self.token(node).lexeme, value)
+
+    def whileStmt(self, node: int):
+        condition = self.first[node]
+        body = self.second[node]
+        while self.isTruthy(self.evaluate(condition)):
+            status = self.execute(body)
+            if status is not None:
+                return status
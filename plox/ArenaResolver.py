@@ -0,0 +1,116 @@
+from Resolver import Resolver, FunctionType
+from LoxError import LoxError
+from AstArena import AstArena, NONE
+from AstSerializer import ASSIGN, BINARY, CALL, GROUPING, LITERAL, LOGICAL, UNARY, VARIABLE, \
+    BLOCK, EXPRESSION, FUNCTION, IF, PRINT, RETURN, VAR, WHILE
+
+# Resolver over AstArena handles. Scopes, slots and error reporting are
+# inherited; the depth and slot of each variable are written back into the
+# arena's second/third columns instead of node attributes.
+class ArenaResolver(Resolver):
+    def __init__(self, arena: AstArena):
+        super().__init__()
+        self.arena = arena
+        self.resolvers = {
+            ASSIGN: self.resolveAssign,
+            BINARY: self.resolveBoth,
+            CALL: self.resolveCall,
+            GROUPING: self.resolveFirst,
+            LITERAL: self.resolveNothing,
+            LOGICAL: self.resolveBoth,
+            UNARY: self.resolveFirst,
+            VARIABLE: self.resolveVariable,
+            BLOCK: self.resolveBlock,
+            EXPRESSION: self.resolveFirst,
+            FUNCTION: self.resolveFunctionStmt,
+            IF: self.resolveIf,
+            PRINT: self.resolveFirst,
+            RETURN: self.resolveReturn,
+            VAR: self.resolveVar,
+            WHILE: self.resolveBoth,
+        }
+
+    def resolveStmt(self, node: int):
+        self.resolvers[self.arena.kind[node]](node)
+
+    def resolveExpr(self, node: int):
+        self.resolvers[self.arena.kind[node]](node)
+
+    def token(self, node: int):
+        return self.arena.tokens[self.arena.token[node]]
+
+    def resolveLocal(self, node: int, name):
+        for i in reversed(range(len(self.scopes))):
+            if name.lexeme in self.scopes[i]:
+                self.arena.second[node] = len(self.scopes) - 1 - i
+                self.arena.third[node] = self.slots[i][name.lexeme]
+                return
+
+    def resolveNothing(self, node: int):
+        return
+
+    def resolveFirst(self, node: int):
+        self.resolveExpr(self.arena.first[node])
+
+    def resolveBoth(self, node: int):
+        self.resolveExpr(self.arena.first[node])
+        self.resolveExpr(self.arena.second[node])
+
+    def resolveAssign(self, node: int):
+        self.resolveExpr(self.arena.first[node])
+        self.resolveLocal(node, self.token(node))
+
+    def resolveCall(self, node: int):
+        self.resolveExpr(self.arena.first[node])
+        for argument in self.arena.list(self.arena.second[node], self.arena.third[node]):
+            self.resolveExpr(argument)
+
+    def resolveVariable(self, node: int):
+        name = self.token(node)
+        if len(self.scopes) != 0 and name.lexeme in self.scopes[-1] and self.scopes[-1][name.lexeme] == False:
+            self.hadError = True
+            LoxError.errorToken(name, "Can't read local variable in its own initializer")
+
+        self.resolveLocal(node, name)
+
+    def resolveBlock(self, node: int):
+        self.beginScope()
+        self.resolveStmts(self.arena.list(self.arena.second[node], self.arena.third[node]))
+        self.endScope()
+
+    def resolveFunctionStmt(self, node: int):
+        name = self.token(node)
+        self.declare(name)
+        self.define(name)
+
+        enclosingFunction = self.currentFunction
+        self.currentFunction = FunctionType.FUNCTION
+
+        self.beginScope()
+        for param in self.arena.params(node):
+            self.declare(param)
+            self.define(param)
+        self.resolveStmts(self.arena.body(node))
+        self.endScope()
+        self.currentFunction = enclosingFunction
+
+    def resolveIf(self, node: int):
+        self.resolveExpr(self.arena.first[node])
+        self.resolveStmt(self.arena.second[node])
+        if self.arena.third[node] != NONE:
+            self.resolveStmt(self.arena.third[node])
+
+    def resolveReturn(self, node: int):
+        if self.currentFunction == FunctionType.NONE:
+            self.hadError = True
+            LoxError.errorToken(self.token(node), "Can't return from top level code.")
+
+        if self.arena.first[node] != NONE:
+            self.resolveExpr(self.arena.first[node])
+
+    def resolveVar(self, node: int):
+        name = self.token(node)
+        self.declare(name)
+        if self.arena.first[node] != NONE:
+            self.resolveExpr(self.arena.first[node])
+        self.define(name)
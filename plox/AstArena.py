@@ -0,0 +1,335 @@
+from array import array
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Token import Token
+from Parser import Parser
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
+from AstSerializer import ASSIGN, BINARY, CALL, GROUPING, LITERAL, LOGICAL, UNARY, VARIABLE, \
+    BLOCK, EXPRESSION, FUNCTION, IF, PRINT, RETURN, VAR, WHILE
+
+# Marks an absent child, token or resolved depth
+NONE = -1
+
+# Stores a whole program as parallel flat arrays instead of one object per
+# node. A node is an integer handle indexing kind/token/first/second/third:
+#
+#   ASSIGN      token=name      first=value     second=depth  third=slot
+#   BINARY      token=operator  first=left      second=right
+#   CALL        token=paren     first=callee    second/third=arguments
+#   GROUPING                    first=expression
+#   LITERAL                     first=constant
+#   LOGICAL     token=operator  first=left      second=right
+#   UNARY       token=operator  first=right
+#   VARIABLE    token=name                      second=depth  third=slot
+#   BLOCK                                       second/third=statements
+#   EXPRESSION                  first=expression
+#   FUNCTION    token=name      first=arity     second/third=params and body
+#   IF                          first=condition second=then   third=else
+#   PRINT                       first=expression
+#   RETURN      token=keyword   first=value
+#   VAR         token=name      first=initializer
+#   WHILE                       first=condition second=body
+#
+# Lists of children are stored as a start and count into children. Function
+# parameters are token indexes stored there right before the body.
+class AstArena:
+    def __init__(self):
+        self.kind = array('b')
+        self.token = array('i')
+        self.first = array('i')
+        self.second = array('i')
+        self.third = array('i')
+        self.children = array('i')
+        self.tokens = []
+        self.constants = []
+
+    def __len__(self):
+        return len(self.kind)
+
+    def add(self, kind: int, token, first: int=NONE, second: int=NONE, third: int=NONE):
+        self.kind.append(kind)
+        if token is None:
+            self.token.append(NONE)
+        else:
+            self.token.append(self.addToken(token))
+        self.first.append(first)
+        self.second.append(second)
+        self.third.append(third)
+        return len(self.kind) - 1
+
+    def addToken(self, token: Token):
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    # Not deduplicated: literal values are shared with their tokens anyway.
+    def addConstant(self, value):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def addList(self, handles):
+        start = len(self.children)
+        for handle in handles:
+            self.children.append(self.handle(handle))
+        return start
+
+    def handle(self, node):
+        if node is None:
+            return NONE
+        return node
+
+    def list(self, start: int, count: int):
+        return self.children[start:start + count]
+
+    def params(self, node: int):
+        start = self.second[node]
+        return [self.tokens[index] for index in self.children[start:start + self.first[node]]]
+
+    def body(self, node: int):
+        start = self.second[node] + self.first[node]
+        return self.children[start:start + self.third[node]]
+
+    # Builders with the same signatures as the node constructors
+    def assign(self, name: Token, value: int):
+        return self.add(ASSIGN, name, value)
+
+    def binary(self, left: int, operator: Token, right: int):
+        return self.add(BINARY, operator, left, right)
+
+    def call(self, callee: int, paren: Token, arguments):
+        return self.add(CALL, paren, callee, self.addList(arguments), len(arguments))
+
+    def grouping(self, expression: int):
+        return self.add(GROUPING, None, expression)
+
+    def literal(self, value):
+        return self.add(LITERAL, None, self.addConstant(value))
+
+    def logical(self, left: int, operator: Token, right: int):
+        return self.add(LOGICAL, operator, left, right)
+
+    def unary(self, operator: Token, right: int):
+        return self.add(UNARY, operator, right)
+
+    def variable(self, name: Token):
+        return self.add(VARIABLE, name)
+
+    def block(self, statements):
+        return self.add(BLOCK, None, NONE, self.addList(statements), len(statements))
+
+    def expression(self, expression: int):
+        return self.add(EXPRESSION, None, expression)
+
+    def function(self, name: Token, params, body):
+        start = len(self.children)
+        for param in params:
+            self.children.append(self.addToken(param))
+        self.addList(body)
+        return self.add(FUNCTION, name, len(params), start, len(body))
+
+    def ifStmt(self, condition: int, thenBranch: int, elseBranch):
+        return self.add(IF, None, condition, thenBranch, self.handle(elseBranch))
+
+    def printStmt(self, expression: int):
+        return self.add(PRINT, None, expression)
+
+    def returnStmt(self, keyword: Token, value):
+        return self.add(RETURN, keyword, self.handle(value))
+
+    def var(self, name: Token, initializer):
+        return self.add(VAR, name, self.handle(initializer))
+
+    def whileStmt(self, condition: int, body: int):
+        return self.add(WHILE, None, condition, body)
+
+# Parses straight into an AstArena; parse() returns the handles of the
+# top-level statements.
+class ArenaParser(Parser):
+    def __init__(self, tokens, arena: AstArena):
+        super().__init__(tokens)
+        self.arena = arena
+        self.Assign = arena.assign
+        self.Binary = arena.binary
+        self.Call = arena.call
+        self.Grouping = arena.grouping
+        self.Literal = arena.literal
+        self.Logical = arena.logical
+        self.Unary = arena.unary
+        self.Variable = arena.variable
+        self.Block = arena.block
+        self.Expression = arena.expression
+        self.Function = arena.function
+        self.If = arena.ifStmt
+        self.Print = arena.printStmt
+        self.Return = arena.returnStmt
+        self.Var = arena.var
+        self.While = arena.whileStmt
+
+    def assignmentTarget(self, expr: int):
+        arena = self.arena
+        if arena.kind[expr] == VARIABLE:
+            return arena.tokens[arena.token[expr]]
+        return None
+
+# Copies Expr/Stmt trees into an arena, keeping the Resolver's annotations.
+class ArenaEncoder(Expr.Visitor, Stmt.Visitor):
+    def __init__(self, arena: AstArena):
+        self.arena = arena
+
+    def encode(self, statements):
+        return [self.encodeNode(statement) for statement in statements]
+
+    def encodeNode(self, node):
+        if node is None:
+            return None
+        return node.accept(self)
+
+    def encodeAll(self, nodes):
+        return [self.encodeNode(node) for node in nodes]
+
+    def resolved(self, handle: int, expr: Expr):
+        if expr.depth is not None:
+            self.arena.second[handle] = expr.depth
+            self.arena.third[handle] = expr.slot
+        return handle
+
+    def visitAssignExpr(self, Expr: Assign):
+        return self.resolved(self.arena.assign(Expr.name, self.encodeNode(Expr.value)), Expr)
+
+    def visitBinaryExpr(self, Expr: Binary):
+        return self.arena.binary(self.encodeNode(Expr.left), Expr.operator, self.encodeNode(Expr.right))
+
+    def visitCallExpr(self, Expr: Call):
+        return self.arena.call(self.encodeNode(Expr.callee), Expr.paren, self.encodeAll(Expr.arguments))
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        return self.arena.grouping(self.encodeNode(Expr.expression))
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return self.arena.literal(Expr.value)
+
+    def visitLogicalExpr(self, Expr: Logical):
+        return self.arena.logical(self.encodeNode(Expr.left), Expr.operator, self.encodeNode(Expr.right))
+
+    def visitUnaryExpr(self, Expr: Unary):
+        return self.arena.unary(Expr.operator, self.encodeNode(Expr.right))
+
+    def visitVariableExpr(self, Expr: Variable):
+        return self.resolved(self.arena.variable(Expr.name), Expr)
+
+    def visitBlockStmt(self, Stmt: Block):
+        return self.arena.block(self.encodeAll(Stmt.statements))
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        return self.arena.expression(self.encodeNode(Stmt.expression))
+
+    def visitFunctionStmt(self, Stmt: Function):
+        return self.arena.function(Stmt.name, Stmt.params, self.encodeAll(Stmt.body))
+
+    def visitIfStmt(self, Stmt: If):
+        return self.arena.ifStmt(self.encodeNode(Stmt.condition), self.encodeNode(Stmt.thenBranch), self.encodeNode(Stmt.elseBranch))
+
+    def visitPrintStmt(self, Stmt: Print):
+        return self.arena.printStmt(self.encodeNode(Stmt.expression))
+
+    def visitReturnStmt(self, Stmt: Return):
+        return self.arena.returnStmt(Stmt.keyword, self.encodeNode(Stmt.value))
+
+    def visitVarStmt(self, Stmt: Var):
+        return self.arena.var(Stmt.name, self.encodeNode(Stmt.initializer))
+
+    def visitWhileStmt(self, Stmt: While):
+        return self.arena.whileStmt(self.encodeNode(Stmt.condition), self.encodeNode(Stmt.body))
+
+# Rebuilds Expr/Stmt trees from arena handles so AstPrinter, the Optimizer
+# and the other backends can work on them.
+class ArenaDecoder:
+    def __init__(self, arena: AstArena):
+        self.arena = arena
+        self.decoders = {
+            ASSIGN: self.decodeAssign,
+            BINARY: self.decodeBinary,
+            CALL: self.decodeCall,
+            GROUPING: self.decodeGrouping,
+            LITERAL: self.decodeLiteral,
+            LOGICAL: self.decodeLogical,
+            UNARY: self.decodeUnary,
+            VARIABLE: self.decodeVariable,
+            BLOCK: self.decodeBlock,
+            EXPRESSION: self.decodeExpression,
+            FUNCTION: self.decodeFunction,
+            IF: self.decodeIf,
+            PRINT: self.decodePrint,
+            RETURN: self.decodeReturn,
+            VAR: self.decodeVar,
+            WHILE: self.decodeWhile,
+        }
+
+    def decode(self, handles):
+        return [self.decodeNode(handle) for handle in handles]
+
+    def decodeNode(self, node: int):
+        if node == NONE:
+            return None
+        return self.decoders[self.arena.kind[node]](node)
+
+    def token(self, node: int):
+        return self.arena.tokens[self.arena.token[node]]
+
+    def resolved(self, expr: Expr, node: int):
+        if self.arena.second[node] != NONE:
+            expr.depth = self.arena.second[node]
+            expr.slot = self.arena.third[node]
+        return expr
+
+    def decodeAssign(self, node: int):
+        return self.resolved(Assign(self.token(node), self.decodeNode(self.arena.first[node])), node)
+
+    def decodeBinary(self, node: int):
+        expr = Binary(self.decodeNode(self.arena.first[node]), self.token(node), self.decodeNode(self.arena.second[node]))
+        expr.operation = BINARY_OPERATORS[expr.operator.type]
+        return expr
+
+    def decodeCall(self, node: int):
+        arguments = self.decode(self.arena.list(self.arena.second[node], self.arena.third[node]))
+        return Call(self.decodeNode(self.arena.first[node]), self.token(node), arguments)
+
+    def decodeGrouping(self, node: int):
+        return Grouping(self.decodeNode(self.arena.first[node]))
+
+    def decodeLiteral(self, node: int):
+        return Literal(self.arena.constants[self.arena.first[node]])
+
+    def decodeLogical(self, node: int):
+        return Logical(self.decodeNode(self.arena.first[node]), self.token(node), self.decodeNode(self.arena.second[node]))
+
+    def decodeUnary(self, node: int):
+        expr = Unary(self.token(node), self.decodeNode(self.arena.first[node]))
+        expr.operation = UNARY_OPERATORS[expr.operator.type]
+        return expr
+
+    def decodeVariable(self, node: int):
+        return self.resolved(Variable(self.token(node)), node)
+
+    def decodeBlock(self, node: int):
+        return Block(self.decode(self.arena.list(self.arena.second[node], self.arena.third[node])))
+
+    def decodeExpression(self, node: int):
+        return Expression(self.decodeNode(self.arena.first[node]))
+
+    def decodeFunction(self, node: int):
+        return Function(self.token(node), self.arena.params(node), self.decode(self.arena.body(node)))
+
+    def decodeIf(self, node: int):
+        return If(self.decodeNode(self.arena.first[node]), self.decodeNode(self.arena.second[node]), self.decodeNode(self.arena.third[node]))
+
+    def decodePrint(self, node: int):
+        return Print(self.decodeNode(self.arena.first[node]))
+
+    def decodeReturn(self, node: int):
+        return Return(self.token(node), self.decodeNode(self.arena.first[node]))
+
+    def decodeVar(self, node: int):
+        return Var(self.token(node), self.decodeNode(self.arena.first[node]))
+
+    def decodeWhile(self, node: int):
+        return While(self.decodeNode(self.arena.first[node]), self.decodeNode(self.arena.second[node]))
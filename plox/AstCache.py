@@ -0,0 +1,72 @@
+import os
+import sys
+from AstSerializer import AstEncoder, AstDecoder
+
+# Bump whenever the node layout, the encoded format or the Resolver's
+# annotations change so stale artifacts are ignored.
+CACHE_VERSION = 2
+MAGIC = b'LOXC'
+CACHE_DIR = '__loxcache__'
+
+class AstCache:
+    def __init__(self, variant: str=""):
+        # variant distinguishes trees built with different front-end options (e.g. -O)
+        self.variant = variant
+        self.hits = 0
+        self.misses = 0
+
+    # The artifact starts with everything it was built from, the source
+    # included, and is only used when all of it matches. Comparing the
+    # source costs less than hashing it, let alone importing hashlib.
+    def key(self, source: str):
+        key = (str(CACHE_VERSION) + '\0' + sys.version + '\0' + self.variant + '\0' + source).encode()
+        return len(key).to_bytes(4, 'big') + key
+
+    # Each variant has its own file, so alternating -O and plain runs of a
+    # script don't overwrite each other's tree
+    def pathFor(self, script):
+        script = os.path.realpath(script)
+        name = os.path.basename(script) + ('.' + self.variant if self.variant else '') + '.astc'
+        return os.path.join(os.path.dirname(script), CACHE_DIR, name)
+
+    def load(self, script, source: str):
+        path = self.pathFor(script)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        header = MAGIC + self.key(source)
+        if not data.startswith(header):
+            self.misses += 1
+            return None
+
+        try:
+            statements = AstDecoder().decode(data[len(header):])
+        except (ValueError, EOFError, TypeError, IndexError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return statements
+
+    def store(self, script, source: str, statements):
+        path = self.pathFor(script)
+        try:
+            payload = AstEncoder().encode(statements)
+        except (ValueError, RecursionError):
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = path + '.' + str(os.getpid()) + '.tmp'
+            with open(temp, 'wb') as f:
+                f.write(MAGIC + self.key(source) + payload)
+            os.replace(temp, path)
+        except OSError:
+            return False
+        return True
+
+    def stats(self):
+        return "[cache] " + str(self.hits) + " hits, " + str(self.misses) + " misses"
@@ -0,0 +1,205 @@
+import marshal
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Token import Token, TokenType
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
+
+TOKEN_TYPES = list(TokenType)
+TOKEN_TYPE_INDEX = {type: i for i, type in enumerate(TOKEN_TYPES)}
+
+# Node kind tags used in the encoded form
+ASSIGN = 0
+BINARY = 1
+CALL = 2
+GROUPING = 3
+LITERAL = 4
+LOGICAL = 5
+UNARY = 6
+VARIABLE = 7
+BLOCK = 8
+EXPRESSION = 9
+FUNCTION = 10
+IF = 11
+PRINT = 12
+RETURN = 13
+VAR = 14
+WHILE = 15
+
+# Flattens a resolved AST into nested tuples that marshal can store.
+# Tokens are deduplicated into one flat table and referenced by index.
+class AstEncoder(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.tokens = []
+        self.tokenIndex = {}
+
+    def encode(self, statements):
+        body = self.encodeAll(statements)
+        return marshal.dumps((tuple(self.tokens), body))
+
+    def encodeNode(self, node):
+        if node is None:
+            return None
+        return node.accept(self)
+
+    def encodeAll(self, nodes):
+        return tuple(self.encodeNode(node) for node in nodes)
+
+    def token(self, token: Token):
+        key = (token.type, token.lexeme, token.literal, token.line)
+        if key not in self.tokenIndex:
+            self.tokenIndex[key] = len(self.tokens) // 4
+            self.tokens.extend((TOKEN_TYPE_INDEX[token.type], token.lexeme, token.literal, token.line))
+        return self.tokenIndex[key]
+
+    def visitAssignExpr(self, Expr: Assign):
+        return (ASSIGN, self.token(Expr.name), self.encodeNode(Expr.value), Expr.depth, Expr.slot)
+
+    def visitBinaryExpr(self, Expr: Binary):
+        return (BINARY, self.encodeNode(Expr.left), self.token(Expr.operator), self.encodeNode(Expr.right))
+
+    def visitCallExpr(self, Expr: Call):
+        return (CALL, self.encodeNode(Expr.callee), self.token(Expr.paren), self.encodeAll(Expr.arguments))
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        return (GROUPING, self.encodeNode(Expr.expression))
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return (LITERAL, Expr.value)
+
+    def visitLogicalExpr(self, Expr: Logical):
+        return (LOGICAL, self.encodeNode(Expr.left), self.token(Expr.operator), self.encodeNode(Expr.right))
+
+    def visitUnaryExpr(self, Expr: Unary):
+        return (UNARY, self.token(Expr.operator), self.encodeNode(Expr.right))
+
+    def visitVariableExpr(self, Expr: Variable):
+        return (VARIABLE, self.token(Expr.name), Expr.depth, Expr.slot)
+
+    def visitBlockStmt(self, Stmt: Block):
+        return (BLOCK, self.encodeAll(Stmt.statements))
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        return (EXPRESSION, self.encodeNode(Stmt.expression))
+
+    def visitFunctionStmt(self, Stmt: Function):
+        params = tuple(self.token(param) for param in Stmt.params)
+        return (FUNCTION, self.token(Stmt.name), params, self.encodeAll(Stmt.body))
+
+    def visitIfStmt(self, Stmt: If):
+        return (IF, self.encodeNode(Stmt.condition), self.encodeNode(Stmt.thenBranch), self.encodeNode(Stmt.elseBranch))
+
+    def visitPrintStmt(self, Stmt: Print):
+        return (PRINT, self.encodeNode(Stmt.expression))
+
+    def visitReturnStmt(self, Stmt: Return):
+        return (RETURN, self.token(Stmt.keyword), self.encodeNode(Stmt.value))
+
+    def visitVarStmt(self, Stmt: Var):
+        return (VAR, self.token(Stmt.name), self.encodeNode(Stmt.initializer))
+
+    def visitWhileStmt(self, Stmt: While):
+        return (WHILE, self.encodeNode(Stmt.condition), self.encodeNode(Stmt.body))
+
+# Rebuilds Expr/Stmt trees from AstEncoder output, including the
+# annotations the Resolver would have added.
+class AstDecoder:
+    def __init__(self):
+        self.tokens = []
+        self.decoders = {
+            ASSIGN: self.decodeAssign,
+            BINARY: self.decodeBinary,
+            CALL: self.decodeCall,
+            GROUPING: self.decodeGrouping,
+            LITERAL: self.decodeLiteral,
+            LOGICAL: self.decodeLogical,
+            UNARY: self.decodeUnary,
+            VARIABLE: self.decodeVariable,
+            BLOCK: self.decodeBlock,
+            EXPRESSION: self.decodeExpression,
+            FUNCTION: self.decodeFunction,
+            IF: self.decodeIf,
+            PRINT: self.decodePrint,
+            RETURN: self.decodeReturn,
+            VAR: self.decodeVar,
+            WHILE: self.decodeWhile,
+        }
+
+    def decode(self, data: bytes):
+        tokens, body = marshal.loads(data)
+        self.decodeTokens(tokens)
+        return self.decodeAll(body)
+
+    # Loads the flat token table that encoded nodes refer to by index
+    def decodeTokens(self, tokens):
+        self.tokens = []
+        for i in range(0, len(tokens), 4):
+            self.tokens.append(Token(TOKEN_TYPES[tokens[i]], tokens[i + 1], tokens[i + 2], tokens[i + 3]))
+
+    def decodeNode(self, data):
+        if data is None:
+            return None
+        return self.decoders[data[0]](data)
+
+    def decodeAll(self, data):
+        return [self.decodeNode(node) for node in data]
+
+    def decodeAssign(self, data):
+        expr = Assign(self.tokens[data[1]], self.decodeNode(data[2]))
+        if data[3] is not None:
+            expr.depth = data[3]
+            expr.slot = data[4]
+        return expr
+
+    def decodeBinary(self, data):
+        expr = Binary(self.decodeNode(data[1]), self.tokens[data[2]], self.decodeNode(data[3]))
+        expr.operation = BINARY_OPERATORS[expr.operator.type]
+        return expr
+
+    def decodeCall(self, data):
+        return Call(self.decodeNode(data[1]), self.tokens[data[2]], self.decodeAll(data[3]))
+
+    def decodeGrouping(self, data):
+        return Grouping(self.decodeNode(data[1]))
+
+    def decodeLiteral(self, data):
+        return Literal(data[1])
+
+    def decodeLogical(self, data):
+        return Logical(self.decodeNode(data[1]), self.tokens[data[2]], self.decodeNode(data[3]))
+
+    def decodeUnary(self, data):
+        expr = Unary(self.tokens[data[1]], self.decodeNode(data[2]))
+        expr.operation = UNARY_OPERATORS[expr.operator.type]
+        return expr
+
+    def decodeVariable(self, data):
+        expr = Variable(self.tokens[data[1]])
+        if data[2] is not None:
+            expr.depth = data[2]
+            expr.slot = data[3]
+        return expr
+
+    def decodeBlock(self, data):
+        return Block(self.decodeAll(data[1]))
+
+    def decodeExpression(self, data):
+        return Expression(self.decodeNode(data[1]))
+
+    def decodeFunction(self, data):
+        params = [self.tokens[param] for param in data[2]]
+        return Function(self.tokens[data[1]], params, self.decodeAll(data[3]))
+
+    def decodeIf(self, data):
+        return If(self.decodeNode(data[1]), self.decodeNode(data[2]), self.decodeNode(data[3]))
+
+    def decodePrint(self, data):
+        return Print(self.decodeNode(data[1]))
+
+    def decodeReturn(self, data):
+        return Return(self.tokens[data[1]], self.decodeNode(data[2]))
+
+    def decodeVar(self, data):
+        return Var(self.tokens[data[1]], self.decodeNode(data[2]))
+
+    def decodeWhile(self, data):
+        return While(self.decodeNode(data[1]), self.decodeNode(data[2]))
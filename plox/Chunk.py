@@ -0,0 +1,98 @@
+from enum import IntEnum
+from Token import Token
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    STORE_LOCAL = 7
+    GET_GLOBAL = 8
+    DEFINE_GLOBAL = 9
+    SET_GLOBAL = 10
+    GET_UPVALUE = 11
+    SET_UPVALUE = 12
+    EQUAL = 13
+    NOT_EQUAL = 14
+    GREATER = 15
+    GREATER_EQUAL = 16
+    LESS = 17
+    LESS_EQUAL = 18
+    ADD = 19
+    SUBTRACT = 20
+    MULTIPLY = 21
+    DIVIDE = 22
+    NOT = 23
+    NEGATE = 24
+    PRINT = 25
+    JUMP = 26
+    POP_JUMP_IF_FALSE = 27
+    JUMP_IF_FALSE = 28
+    JUMP_IF_TRUE = 29
+    CALL = 30
+    CLOSURE = 31
+    CLOSE_UPVALUE = 32
+    RETURN = 33
+
+# Number of inline operands following each opcode. CLOSURE is followed by
+# two more operands per captured variable, see Compiler.visitFunctionStmt.
+OPERANDS = {
+    OpCode.CONSTANT: 1,
+    OpCode.GET_LOCAL: 1,
+    OpCode.SET_LOCAL: 1,
+    OpCode.STORE_LOCAL: 1,
+    OpCode.GET_GLOBAL: 1,
+    OpCode.DEFINE_GLOBAL: 1,
+    OpCode.SET_GLOBAL: 1,
+    OpCode.GET_UPVALUE: 1,
+    OpCode.SET_UPVALUE: 1,
+    OpCode.JUMP: 1,
+    OpCode.POP_JUMP_IF_FALSE: 1,
+    OpCode.JUMP_IF_FALSE: 1,
+    OpCode.JUMP_IF_TRUE: 1,
+    OpCode.CALL: 1,
+    OpCode.CLOSURE: 1,
+    OpCode.CLOSE_UPVALUE: 1,
+}
+
+class Chunk:
+    def __init__(self):
+        self.code = []
+        self.constants = []
+        self.constantIndex = {}
+        # Token that produced each entry of code, used to report runtime errors.
+        self.tokens = []
+
+    def write(self, byte: int, token: Token):
+        self.code.append(byte)
+        self.tokens.append(token)
+        return len(self.code) - 1
+
+    def addConstant(self, value):
+        key = (type(value), value)
+        if key not in self.constantIndex:
+            self.constants.append(value)
+            self.constantIndex[key] = len(self.constants) - 1
+        return self.constantIndex[key]
+
+    def disassemble(self, name: str):
+        lines = ["== " + name + " =="]
+        offset = 0
+        while offset < len(self.code):
+            op = OpCode(self.code[offset])
+            line = self.tokens[offset].line if self.tokens[offset] is not None else "|"
+            text = str(offset).rjust(4) + " " + str(line).rjust(4) + " " + op.name
+            count = OPERANDS.get(op, 0)
+            if op == OpCode.CLOSURE:
+                count += 2 * self.constants[self.code[offset + 1]].upvalueCount
+            operands = self.code[offset + 1:offset + 1 + count]
+            if len(operands) > 0:
+                text += " " + " ".join(str(operand) for operand in operands)
+            if op in (OpCode.CONSTANT, OpCode.GET_GLOBAL, OpCode.DEFINE_GLOBAL, OpCode.SET_GLOBAL, OpCode.CLOSURE):
+                text += " (" + str(self.constants[operands[0]]) + ")"
+            lines.append(text)
+            offset += 1 + count
+        return "\n".join(lines)
@@ -0,0 +1,382 @@
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Token import TokenType
+from RuntimeErr import RuntimeErr
+from LoxError import LoxError
+from Environment import Environment, GlobalEnvironment
+from LoxCallable import LoxCallable
+from Natives import NATIVES, NativeError
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
+
+class ReturnValue:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+class CompiledFunction(LoxCallable):
+    def __init__(self, declaration: Function, body, closure: Environment):
+        self.declaration = declaration
+        self.params = [param.lexeme for param in declaration.params]
+        self.body = body
+        self.closure = closure
+
+    def call(self, interpreter, arguments):
+        result = self.body(Environment(self.closure, list(arguments)))
+        if result is None:
+            return None
+        return result.value
+
+    def arity(self):
+        return len(self.params)
+
+    def __str__(self):
+        return "<fn " + self.declaration.name.lexeme + ">"
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self, output=None):
+        self.output = output
+        self.hadRuntimeError = False
+        self.globals = GlobalEnvironment()
+        self.scopeDepth = 0
+        NATIVES.install(self.globals.define)
+
+    def interpret(self, statements):
+        program = self.sequence(statements)
+        try:
+            program(self.globals)
+        except RuntimeErr as err:
+            self.hadRuntimeError = True
+            LoxError.runtimeError(err, self.output)
+
+    def compileExpr(self, expr: Expr):
+        return expr.accept(self)
+
+    def compileStmt(self, stmt: Stmt):
+        return stmt.accept(self)
+
+    def sequence(self, statements):
+        compiled = [self.compileStmt(statement) for statement in statements]
+
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(env):
+            for statement in compiled:
+                result = statement(env)
+                if result is not None:
+                    return result
+            return None
+        return run
+
+    def stringify(self, object):
+        if object is None:
+            return "nil"
+        if type(object) == float:
+            text = str(object)
+            if text.endswith('.0'):
+                text = text[:-2]
+            return text
+        return str(object)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        value = Expr.value
+        return lambda env: value
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        return self.compileExpr(Expr.expression)
+
+    def visitLogicalExpr(self, Expr: Logical):
+        left = self.compileExpr(Expr.left)
+        right = self.compileExpr(Expr.right)
+
+        if Expr.operator.type == TokenType.OR:
+            def orExpr(env):
+                value = left(env)
+                if value is None or value is False:
+                    return right(env)
+                return value
+            return orExpr
+
+        def andExpr(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+        return andExpr
+
+    def visitUnaryExpr(self, Expr: Unary):
+        right = self.compileExpr(Expr.right)
+        operator = Expr.operator
+
+        if operator.type == TokenType.MINUS:
+            operation = UNARY_OPERATORS[TokenType.MINUS]
+            def negate(env):
+                value = right(env)
+                if type(value) is not float:
+                    return operation(operator, value)
+                return -value
+            return negate
+
+        if operator.type == TokenType.BANG:
+            def bang(env):
+                value = right(env)
+                return value is None or value is False
+            return bang
+
+        return lambda env: None
+
+    def visitBinaryExpr(self, Expr: Binary):
+        left = self.compileExpr(Expr.left)
+        right = self.compileExpr(Expr.right)
+        operator = Expr.operator
+        type_ = operator.type
+        # Handles the operands the inlined float cases don't, e.g. arrays
+        operation = BINARY_OPERATORS.get(type_)
+
+        if type_ == TokenType.PLUS:
+            def add(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is float and type(b) is float:
+                    return a + b
+                if type(a) is str and type(b) is str:
+                    return a + b
+                return operation(operator, a, b)
+            return add
+        if type_ == TokenType.MINUS:
+            def subtract(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a - b
+            return subtract
+        if type_ == TokenType.SLASH:
+            def divide(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a / b
+            return divide
+        if type_ == TokenType.STAR:
+            def multiply(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a * b
+            return multiply
+        if type_ == TokenType.GREATER:
+            def greater(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a > b
+            return greater
+        if type_ == TokenType.GREATER_EQUAL:
+            def greaterEqual(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a >= b
+            return greaterEqual
+        if type_ == TokenType.LESS:
+            def less(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a < b
+            return less
+        if type_ == TokenType.LESS_EQUAL:
+            def lessEqual(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is not float or type(b) is not float:
+                    return operation(operator, a, b)
+                return a <= b
+            return lessEqual
+        if type_ == TokenType.BANG_EQUAL:
+            return lambda env: not (left(env) == right(env))
+        if type_ == TokenType.EQUAL_EQUAL:
+            return lambda env: left(env) == right(env)
+
+        return lambda env: None
+
+    def visitCallExpr(self, Expr: Call):
+        callee = self.compileExpr(Expr.callee)
+        arguments = [self.compileExpr(argument) for argument in Expr.arguments]
+        paren = Expr.paren
+        interpreter = self
+
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise RuntimeErr(paren, "Can only call functions and classes")
+            if len(values) != function.arity():
+                raise RuntimeErr(paren, "Expected " + str(function.arity()) + " arguments but got " + str(len(values)) + " instead.")
+            try:
+                return function.call(interpreter, values)
+            except NativeError as err:
+                raise RuntimeErr(paren, err.message)
+        return call
+
+    def visitVariableExpr(self, Expr: Variable):
+        name = Expr.name.lexeme
+        token = Expr.name
+
+        if Expr.depth is None:
+            cells = self.globals.cells
+            def getGlobal(env):
+                if name in cells:
+                    return cells[name].value
+                raise RuntimeErr(token, "Undefined variable '" + name + "'.")
+            return getGlobal
+
+        depth = Expr.depth
+        slot = Expr.slot
+        if depth == 0:
+            return lambda env: env.values[slot]
+        if depth == 1:
+            return lambda env: env.enclosing.values[slot]
+        if depth == 2:
+            return lambda env: env.enclosing.enclosing.values[slot]
+        return lambda env: env.getAt(depth, slot)
+
+    def visitAssignExpr(self, Expr: Assign):
+        value = self.compileExpr(Expr.value)
+        name = Expr.name.lexeme
+        token = Expr.name
+
+        if Expr.depth is None:
+            cells = self.globals.cells
+            def assignGlobal(env):
+                result = value(env)
+                if name not in cells:
+                    raise RuntimeErr(token, "Undefined variable '" + name + "'.")
+                cells[name].value = result
+                return result
+            return assignGlobal
+
+        depth = Expr.depth
+        slot = Expr.slot
+        if depth == 0:
+            def assignLocal(env):
+                result = value(env)
+                env.values[slot] = result
+                return result
+        elif depth == 1:
+            def assignLocal(env):
+                result = value(env)
+                env.enclosing.values[slot] = result
+                return result
+        else:
+            def assignLocal(env):
+                result = value(env)
+                env.assignAt(depth, slot, result)
+                return result
+        return assignLocal
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        expression = self.compileExpr(Stmt.expression)
+
+        def run(env):
+            expression(env)
+        return run
+
+    def visitPrintStmt(self, Stmt: Print):
+        expression = self.compileExpr(Stmt.expression)
+        stringify = self.stringify
+        output = self.output
+
+        def run(env):
+            print(stringify(expression(env)), file=output)
+        return run
+
+    def visitVarStmt(self, Stmt: Var):
+        name = Stmt.name.lexeme
+        initializer = lambda env: None
+        if Stmt.initializer is not None:
+            initializer = self.compileExpr(Stmt.initializer)
+
+        if self.scopeDepth == 0:
+            def defineGlobal(env):
+                env.define(name, initializer(env))
+            return defineGlobal
+
+        def defineLocal(env):
+            env.values.append(initializer(env))
+        return defineLocal
+
+    def visitBlockStmt(self, Stmt: Block):
+        self.scopeDepth += 1
+        body = self.sequence(Stmt.statements)
+        self.scopeDepth -= 1
+
+        def run(env):
+            return body(Environment(env))
+        return run
+
+    def visitIfStmt(self, Stmt: If):
+        condition = self.compileExpr(Stmt.condition)
+        thenBranch = self.compileStmt(Stmt.thenBranch)
+
+        if Stmt.elseBranch is None:
+            def runIf(env):
+                value = condition(env)
+                if value is None or value is False:
+                    return None
+                return thenBranch(env)
+            return runIf
+
+        elseBranch = self.compileStmt(Stmt.elseBranch)
+        def runIfElse(env):
+            value = condition(env)
+            if value is None or value is False:
+                return elseBranch(env)
+            return thenBranch(env)
+        return runIfElse
+
+    def visitWhileStmt(self, Stmt: While):
+        condition = self.compileExpr(Stmt.condition)
+        body = self.compileStmt(Stmt.body)
+
+        def run(env):
+            while True:
+                value = condition(env)
+                if value is None or value is False:
+                    return None
+                result = body(env)
+                if result is not None:
+                    return result
+        return run
+
+    def visitFunctionStmt(self, Stmt: Function):
+        name = Stmt.name.lexeme
+        declaration = Stmt
+        isGlobal = self.scopeDepth == 0
+        self.scopeDepth += 1
+        body = self.sequence(Stmt.body)
+        self.scopeDepth -= 1
+
+        if isGlobal:
+            def defineGlobal(env):
+                env.define(name, CompiledFunction(declaration, body, env))
+            return defineGlobal
+
+        def defineLocal(env):
+            env.values.append(CompiledFunction(declaration, body, env))
+        return defineLocal
+
+    def visitReturnStmt(self, Stmt: Return):
+        if Stmt.value is None:
+            return lambda env: ReturnValue(None)
+
+        value = self.compileExpr(Stmt.value)
+        return lambda env: ReturnValue(value(env))
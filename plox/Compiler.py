@@ -0,0 +1,280 @@
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Token import Token, TokenType
+from Chunk import Chunk, OpCode
+
+BINARY_OPCODES = {
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+}
+
+class FunctionProto:
+    def __init__(self, name: str, arity: int):
+        self.name = name
+        self.arity = arity
+        self.chunk = Chunk()
+        self.upvalueCount = 0
+        self.slotCount = 0
+
+    def __str__(self):
+        if self.name is None:
+            return "<script>"
+        return "<fn " + self.name + ">"
+
+class Local:
+    def __init__(self, name: str, depth: int, slot: int):
+        self.name = name
+        self.depth = depth
+        self.slot = slot
+        self.isCaptured = False
+
+class FunctionState:
+    def __init__(self, enclosing: 'FunctionState', proto: FunctionProto):
+        self.enclosing = enclosing
+        self.proto = proto
+        self.locals = []
+        self.upvalues = []
+        self.scopeDepth = 0
+
+class Compiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.state = None
+
+    def compile(self, statements):
+        self.state = FunctionState(None, FunctionProto(None, 0))
+        for statement in statements:
+            self.compileStmt(statement)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+
+        proto = self.state.proto
+        self.state = None
+        return proto
+
+    def compileStmt(self, stmt: Stmt):
+        stmt.accept(self)
+
+    def compileExpr(self, expr: Expr):
+        expr.accept(self)
+
+    def chunk(self):
+        return self.state.proto.chunk
+
+    def emit(self, op: OpCode, token: Token=None):
+        return self.chunk().write(int(op), token)
+
+    def emitWithOperand(self, op: OpCode, operand: int, token: Token=None):
+        self.emit(op, token)
+        return self.chunk().write(operand, token)
+
+    def emitJump(self, op: OpCode, token: Token=None):
+        return self.emitWithOperand(op, -1, token)
+
+    def patchJump(self, offset: int):
+        self.chunk().code[offset] = len(self.chunk().code)
+
+    def makeConstant(self, value):
+        return self.chunk().addConstant(value)
+
+    def beginScope(self):
+        self.state.scopeDepth += 1
+
+    def endScope(self):
+        state = self.state
+        state.scopeDepth -= 1
+        while len(state.locals) > 0 and state.locals[-1].depth > state.scopeDepth:
+            local = state.locals.pop()
+            if local.isCaptured:
+                self.emitWithOperand(OpCode.CLOSE_UPVALUE, local.slot)
+
+    def addLocal(self, name: Token):
+        state = self.state
+        local = Local(name.lexeme, state.scopeDepth, len(state.locals))
+        state.locals.append(local)
+        if len(state.locals) > state.proto.slotCount:
+            state.proto.slotCount = len(state.locals)
+        return local.slot
+
+    def resolveLocal(self, state: FunctionState, name: Token):
+        for local in reversed(state.locals):
+            if local.name == name.lexeme:
+                return local
+        return None
+
+    def addUpvalue(self, state: FunctionState, index: int, isLocal: bool):
+        for i in range(len(state.upvalues)):
+            if state.upvalues[i] == (index, isLocal):
+                return i
+        state.upvalues.append((index, isLocal))
+        state.proto.upvalueCount = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolveUpvalue(self, state: FunctionState, name: Token):
+        if state.enclosing is None:
+            return -1
+
+        local = self.resolveLocal(state.enclosing, name)
+        if local is not None:
+            local.isCaptured = True
+            return self.addUpvalue(state, local.slot, True)
+
+        upvalue = self.resolveUpvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.addUpvalue(state, upvalue, False)
+
+        return -1
+
+    def function(self, Stmt: Function):
+        state = FunctionState(self.state, FunctionProto(Stmt.name.lexeme, len(Stmt.params)))
+        self.state = state
+        self.beginScope()
+        for param in Stmt.params:
+            self.addLocal(param)
+        for statement in Stmt.body:
+            self.compileStmt(statement)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+        self.state = state.enclosing
+
+        self.emitWithOperand(OpCode.CLOSURE, self.makeConstant(state.proto), Stmt.name)
+        for index, isLocal in state.upvalues:
+            self.chunk().write(1 if isLocal else 0, Stmt.name)
+            self.chunk().write(index, Stmt.name)
+
+    def visitAssignExpr(self, Expr: Assign):
+        self.compileExpr(Expr.value)
+        local = self.resolveLocal(self.state, Expr.name)
+        if local is not None:
+            self.emitWithOperand(OpCode.SET_LOCAL, local.slot, Expr.name)
+            return
+
+        upvalue = self.resolveUpvalue(self.state, Expr.name)
+        if upvalue != -1:
+            self.emitWithOperand(OpCode.SET_UPVALUE, upvalue, Expr.name)
+            return
+
+        self.emitWithOperand(OpCode.SET_GLOBAL, self.makeConstant(Expr.name.lexeme), Expr.name)
+
+    def visitBinaryExpr(self, Expr: Binary):
+        self.compileExpr(Expr.left)
+        self.compileExpr(Expr.right)
+        self.emit(BINARY_OPCODES[Expr.operator.type], Expr.operator)
+
+    def visitCallExpr(self, Expr: Call):
+        self.compileExpr(Expr.callee)
+        for argument in Expr.arguments:
+            self.compileExpr(argument)
+        self.emitWithOperand(OpCode.CALL, len(Expr.arguments), Expr.paren)
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        self.compileExpr(Expr.expression)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        if Expr.value is None:
+            self.emit(OpCode.NIL)
+        elif Expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif Expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emitWithOperand(OpCode.CONSTANT, self.makeConstant(Expr.value))
+
+    def visitLogicalExpr(self, Expr: Logical):
+        self.compileExpr(Expr.left)
+        if Expr.operator.type == TokenType.OR:
+            endJump = self.emitJump(OpCode.JUMP_IF_TRUE, Expr.operator)
+        else:
+            endJump = self.emitJump(OpCode.JUMP_IF_FALSE, Expr.operator)
+        self.emit(OpCode.POP)
+        self.compileExpr(Expr.right)
+        self.patchJump(endJump)
+
+    def visitUnaryExpr(self, Expr: Unary):
+        self.compileExpr(Expr.right)
+        if Expr.operator.type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE, Expr.operator)
+        elif Expr.operator.type == TokenType.BANG:
+            self.emit(OpCode.NOT, Expr.operator)
+
+    def visitVariableExpr(self, Expr: Variable):
+        local = self.resolveLocal(self.state, Expr.name)
+        if local is not None:
+            self.emitWithOperand(OpCode.GET_LOCAL, local.slot, Expr.name)
+            return
+
+        upvalue = self.resolveUpvalue(self.state, Expr.name)
+        if upvalue != -1:
+            self.emitWithOperand(OpCode.GET_UPVALUE, upvalue, Expr.name)
+            return
+
+        self.emitWithOperand(OpCode.GET_GLOBAL, self.makeConstant(Expr.name.lexeme), Expr.name)
+
+    def visitBlockStmt(self, Stmt: Block):
+        self.beginScope()
+        for statement in Stmt.statements:
+            self.compileStmt(statement)
+        self.endScope()
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        self.compileExpr(Stmt.expression)
+        self.emit(OpCode.POP)
+
+    def visitFunctionStmt(self, Stmt: Function):
+        if self.state.scopeDepth == 0:
+            self.function(Stmt)
+            self.emitWithOperand(OpCode.DEFINE_GLOBAL, self.makeConstant(Stmt.name.lexeme), Stmt.name)
+        else:
+            slot = self.addLocal(Stmt.name)
+            self.function(Stmt)
+            self.emitWithOperand(OpCode.STORE_LOCAL, slot, Stmt.name)
+
+    def visitIfStmt(self, Stmt: If):
+        self.compileExpr(Stmt.condition)
+        elseJump = self.emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.compileStmt(Stmt.thenBranch)
+        if Stmt.elseBranch is None:
+            self.patchJump(elseJump)
+            return
+
+        endJump = self.emitJump(OpCode.JUMP)
+        self.patchJump(elseJump)
+        self.compileStmt(Stmt.elseBranch)
+        self.patchJump(endJump)
+
+    def visitPrintStmt(self, Stmt: Print):
+        self.compileExpr(Stmt.expression)
+        self.emit(OpCode.PRINT)
+
+    def visitReturnStmt(self, Stmt: Return):
+        if Stmt.value is None:
+            self.emit(OpCode.NIL, Stmt.keyword)
+        else:
+            self.compileExpr(Stmt.value)
+        self.emit(OpCode.RETURN, Stmt.keyword)
+
+    def visitVarStmt(self, Stmt: Var):
+        if Stmt.initializer is None:
+            self.emit(OpCode.NIL, Stmt.name)
+        else:
+            self.compileExpr(Stmt.initializer)
+
+        if self.state.scopeDepth == 0:
+            self.emitWithOperand(OpCode.DEFINE_GLOBAL, self.makeConstant(Stmt.name.lexeme), Stmt.name)
+        else:
+            self.emitWithOperand(OpCode.STORE_LOCAL, self.addLocal(Stmt.name), Stmt.name)
+
+    def visitWhileStmt(self, Stmt: While):
+        loopStart = len(self.chunk().code)
+        self.compileExpr(Stmt.condition)
+        exitJump = self.emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.compileStmt(Stmt.body)
+        self.emitWithOperand(OpCode.JUMP, loopStart)
+        self.patchJump(exitJump)
@@ -0,0 +1,11 @@
+# Statements report how they completed through their return value instead
+# of raising: None means they ran to the end, otherwise one of these.
+
+# A return statement ran, its value is in the interpreter's returnValue.
+RETURNED = 1
+
+# A return statement's value was a call to a Lox function. The callee and
+# arguments are left in the interpreter's tailFunction and tailArguments for
+# the caller's LoxFunction.call to run in its own loop, so tail recursion
+# doesn't nest Python frames.
+TAIL_CALL = 2
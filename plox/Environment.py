@@ -1,13 +1,18 @@
+import itertools
 from Token import Token
 from RuntimeErr import RuntimeErr
 
 class Environment:
-    def __init__(self, enclosing: 'Environment'=None):
+    __slots__ = ('enclosing', 'values')
+
+    def __init__(self, enclosing=None, values=None):
         self.enclosing = enclosing
-        self.value_map = {}
+        # Locals live in the slot the Resolver assigned them, which is their
+        # declaration order within the scope, so defining one is an append.
+        self.values = [] if values is None else values
 
     def define(self, name: str, value):
-        self.value_map[name] = value
+        self.values.append(value)
     
     def ancestor(self, distance: int):
         environment = self
@@ -16,27 +21,50 @@ class Environment:
         
         return environment
     
-    def getAt(self, distance: int, name: str):
-        return self.ancestor(distance).value_map[name]
-    
-    def assignAt(self, distance: int, name: Token, value):
-        self.ancestor(distance).value_map[name.lexeme] = value
+    def getAt(self, distance: int, slot: int):
+        environment = self
+        while distance > 0:
+            environment = environment.enclosing
+            distance -= 1
+        return environment.values[slot]
     
+    def assignAt(self, distance: int, slot: int, value):
+        environment = self
+        while distance > 0:
+            environment = environment.enclosing
+            distance -= 1
+        environment.values[slot] = value
+
+# Every GlobalEnvironment and every redefinition takes a fresh number, so a
+# version cached on a node only ever matches the table that produced it.
+VERSIONS = itertools.count()
+
+class GlobalCell:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+# Globals live in cells that nodes can cache; assigning updates the cell in
+# place and only redefining a name replaces it and bumps the version.
+class GlobalEnvironment:
+    def __init__(self):
+        self.cells = {}
+        self.version = next(VERSIONS)
+
+    def define(self, name: str, value):
+        if name in self.cells:
+            self.version = next(VERSIONS)
+        self.cells[name] = GlobalCell(value)
+
+    def cell(self, name: Token):
+        cell = self.cells.get(name.lexeme)
+        if cell is None:
+            raise RuntimeErr(name, "Undefined variable '" + name.lexeme + "'.")
+        return cell
+
     def get(self, name: Token):
-        if name.lexeme in self.value_map:
-            return self.value_map[name.lexeme]
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-        
-        raise RuntimeErr(name, "Undefined variable '" + name.lexeme + "'.")
+        return self.cell(name).value
     
     def assign(self, name: Token, value):
-        if (name.lexeme in self.value_map):
-            self.value_map[name.lexeme] = value
-            return
-        elif self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-        
-        raise RuntimeErr(name, "Undefined variable '" + name.lexeme + "'.")
-    
\ No newline at end of file
+        self.cell(name).value = value
@@ -1,77 +1,71 @@
 # Generated by tool/GenerateAst.py
-from abc import ABC, abstractmethod
 from Token import Token
 
-class Expr(ABC):
-    class Visitor(ABC):
-        @abstractmethod
+class Expr:
+    __slots__ = ()
+
+    class Visitor:
         def visitAssignExpr(self, Expr: 'Assign'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitBinaryExpr(self, Expr: 'Binary'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitCallExpr(self, Expr: 'Call'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitGroupingExpr(self, Expr: 'Grouping'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitLiteralExpr(self, Expr: 'Literal'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitLogicalExpr(self, Expr: 'Logical'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitUnaryExpr(self, Expr: 'Unary'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitVariableExpr(self, Expr: 'Variable'):
-            pass
+            raise NotImplementedError
 
 class Assign(Expr):
-    name = None
-    value = None
+    __slots__ = ('name', 'value', 'depth', 'slot', 'cell', 'version')
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
+        self.cell = None
+        self.version = None
 
     def accept(self, visitor):
         return visitor.visitAssignExpr(self)
 
 class Binary(Expr):
-    left = None
-    operator = None
-    right = None
+    __slots__ = ('left', 'operator', 'right', 'operation')
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.operation = None
 
     def accept(self, visitor):
         return visitor.visitBinaryExpr(self)
 
 class Call(Expr):
-    callee = None
-    paren = None
-    arguments = None
+    __slots__ = ('callee', 'paren', 'arguments', 'function')
     def __init__(self, callee: Expr, paren: Token, arguments):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
+        self.function = None
 
     def accept(self, visitor):
         return visitor.visitCallExpr(self)
 
 class Grouping(Expr):
-    expression = None
+    __slots__ = ('expression',)
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -79,7 +73,7 @@ class Grouping(Expr):
         return visitor.visitGroupingExpr(self)
 
 class Literal(Expr):
-    value = None
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -87,9 +81,7 @@ class Literal(Expr):
         return visitor.visitLiteralExpr(self)
 
 class Logical(Expr):
-    left = None
-    operator = None
-    right = None
+    __slots__ = ('left', 'operator', 'right')
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
@@ -99,19 +91,23 @@ class Logical(Expr):
         return visitor.visitLogicalExpr(self)
 
 class Unary(Expr):
-    operator = None
-    right = None
+    __slots__ = ('operator', 'right', 'operation')
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
+        self.operation = None
 
     def accept(self, visitor):
         return visitor.visitUnaryExpr(self)
 
 class Variable(Expr):
-    name = None
+    __slots__ = ('name', 'depth', 'slot', 'cell', 'version')
     def __init__(self, name: Token):
         self.name = name
+        self.depth = None
+        self.slot = None
+        self.cell = None
+        self.version = None
 
     def accept(self, visitor):
         return visitor.visitVariableExpr(self)
@@ -0,0 +1,175 @@
+import marshal
+import os
+import sys
+import zlib
+from array import array
+from Environment import Environment, GlobalEnvironment, VERSIONS
+from LoxCallable import LoxFunction
+from LoxArray import LoxArray
+from Natives import NATIVES, NativeFunction
+from AstSerializer import AstEncoder, AstDecoder
+
+# Bump whenever the encoded heap or AstSerializer's format changes. The
+# marshalled heap is zlib compressed, encoded trees shrink to about a sixth.
+SNAPSHOT_VERSION = 1
+MAGIC = b'LOXH'
+
+# Heap object tags used in the encoded form
+GLOBALS = 0
+ENVIRONMENT = 1
+FUNCTION = 2
+NATIVE = 3
+ARRAY = 4
+
+class SnapshotError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+# Flattens the globals of a tree Interpreter and everything reachable from
+# them into tuples that marshal can store. Numbers, strings, booleans and
+# nil are stored as they are; functions, environments and arrays become
+# heap objects referenced as (index,), so closures sharing an environment
+# and cycles through it survive. Function declarations are encoded once
+# each with AstEncoder, sharing one token table.
+class HeapEncoder:
+    def __init__(self, globals: GlobalEnvironment):
+        self.globals = globals
+        self.ast = AstEncoder()
+        self.declarations = []
+        self.declarationIndex = {}
+        self.objects = [(GLOBALS,)]
+        self.objectIndex = {id(globals): 0}
+        self.pending = []
+
+    def encode(self):
+        cells = []
+        for name, cell in self.globals.cells.items():
+            # A fresh interpreter already defines the untouched natives
+            if name not in NATIVES.functions or cell.value is not NATIVES.functions[name]:
+                cells.append((name, self.value(cell.value)))
+
+        # A worklist rather than recursion, deep closure chains can't overflow
+        while self.pending:
+            index, value = self.pending.pop()
+            self.objects[index] = self.encodeObject(value)
+        return marshal.dumps((sys.byteorder, tuple(self.ast.tokens), tuple(self.declarations),
+                              tuple(self.objects), tuple(cells)))
+
+    def value(self, value):
+        if value is None or type(value) in (bool, float, int, str):
+            return value
+        index = self.objectIndex.get(id(value))
+        if index is None:
+            if type(value) not in (Environment, LoxFunction, NativeFunction, LoxArray):
+                raise SnapshotError("Can't snapshot a value of type " + type(value).__name__)
+            index = len(self.objects)
+            self.objectIndex[id(value)] = index
+            self.objects.append(None)
+            self.pending.append((index, value))
+        return (index,)
+
+    def encodeObject(self, value):
+        kind = type(value)
+        if kind is Environment:
+            return (ENVIRONMENT, self.value(value.enclosing), tuple(self.value(item) for item in value.values))
+        if kind is LoxFunction:
+            return (FUNCTION, self.declaration(value.declaration), self.value(value.closure))
+        if kind is NativeFunction:
+            return (NATIVE, value.name)
+        return (ARRAY, value.values.tobytes())
+
+    def declaration(self, declaration):
+        index = self.declarationIndex.get(id(declaration))
+        if index is None:
+            index = len(self.declarations)
+            self.declarationIndex[id(declaration)] = index
+            self.declarations.append(self.ast.encodeNode(declaration))
+        return index
+
+# Rebuilds the heap encoded by HeapEncoder on top of another interpreter's
+# globals. Every object is created empty first, so references between them,
+# cyclic ones included, can be filled in afterwards.
+class HeapDecoder:
+    def __init__(self, globals: GlobalEnvironment):
+        self.globals = globals
+        self.objects = []
+
+    def decode(self, data: bytes):
+        byteorder, tokens, declarations, objects, cells = marshal.loads(data)
+        ast = AstDecoder()
+        ast.decodeTokens(tokens)
+        declarations = [ast.decodeNode(declaration) for declaration in declarations]
+
+        self.objects = [self.create(encoded, declarations) for encoded in objects]
+        for value, encoded in zip(self.objects, objects):
+            kind = encoded[0]
+            if kind == ENVIRONMENT:
+                value.enclosing = self.value(encoded[1])
+                value.values = [self.value(item) for item in encoded[2]]
+            elif kind == FUNCTION:
+                value.closure = self.value(encoded[2])
+            elif kind == ARRAY and byteorder != sys.byteorder:
+                value.values.byteswap()
+        return [(name, self.value(value)) for name, value in cells]
+
+    def create(self, encoded, declarations):
+        kind = encoded[0]
+        if kind == GLOBALS:
+            return self.globals
+        if kind == ENVIRONMENT:
+            return Environment()
+        if kind == FUNCTION:
+            return LoxFunction(declarations[encoded[1]], None)
+        if kind == NATIVE:
+            native = NATIVES.functions.get(encoded[1])
+            if native is None:
+                raise SnapshotError("Unknown native function '" + encoded[1] + "'")
+            return native
+        values = array('d')
+        values.frombytes(encoded[1])
+        return LoxArray(values)
+
+    def value(self, value):
+        if type(value) is tuple:
+            return self.objects[value[0]]
+        return value
+
+# Saves the globals of a tree Interpreter after it ran a prelude and
+# restores them into a fresh one, possibly in another process, so a script
+# starts with the prelude's functions and variables already defined instead
+# of parsing, resolving and running it again.
+class HeapSnapshot:
+
+    @staticmethod
+    def save(interpreter, path: str):
+        payload = zlib.compress(HeapEncoder(interpreter.global_scope).encode())
+        temp = path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(MAGIC + bytes([SNAPSHOT_VERSION]) + payload)
+        os.replace(temp, path)
+
+    # Defines the snapshot's globals in interpreter, replacing any of the
+    # same name, and returns how many it defined
+    @staticmethod
+    def restore(interpreter, path: str):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as err:
+            raise SnapshotError("Can't read " + path + ": " + err.strerror)
+        if not data.startswith(MAGIC) or data[len(MAGIC):len(MAGIC) + 1] != bytes([SNAPSHOT_VERSION]):
+            raise SnapshotError(path + " is not a heap snapshot of this version")
+
+        globals = interpreter.global_scope
+        try:
+            cells = HeapDecoder(globals).decode(zlib.decompress(data[len(MAGIC) + 1:]))
+        except (zlib.error, ValueError, EOFError, TypeError, IndexError, KeyError):
+            raise SnapshotError(path + " is corrupt")
+        for name, value in cells:
+            globals.define(name, value)
+        # Nodes that cached a cell before the restore look it up again
+        globals.version = next(VERSIONS)
+        return len(cells)
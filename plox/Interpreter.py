@@ -3,27 +3,26 @@ from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Retur
 from Token import Token, TokenType
 from RuntimeErr import RuntimeErr
 from LoxError import LoxError
-from Environment import Environment
+from Environment import Environment, GlobalEnvironment
 from LoxCallable import LoxCallable, LoxFunction
-from ReturnBreak import ReturnBreak
-import time
+from Natives import NATIVES, NativeError
+from Completion import RETURNED, TAIL_CALL
 
 class Interpreter(Expr.Visitor, Stmt.Visitor):
-    hadRuntimeError = False
-    environment = Environment()
-    global_scope = environment
-    local_scope = {}
-
-    def __init__(self):
-        class ClockCallable(LoxCallable):
-            def arity(self):
-                return 0
-            def call(self, interpreter, arguments):
-                return time.time() * 1000
-            def __str__(self):
-                return "<native fun>"
-        
-        self.global_scope.define("clock", ClockCallable)
+    # Print statements and runtime errors write to output, sys.stdout when
+    # it is None. All other state is per instance, so interpreters in
+    # different threads don't share globals.
+    def __init__(self, output=None):
+        self.output = output
+        self.hadRuntimeError = False
+        self.global_scope = GlobalEnvironment()
+        self.environment = self.global_scope
+        NATIVES.install(self.global_scope.define)
+        self.returnValue = None
+        self.tailFunction = None
+        self.tailArguments = None
+        # Set to a Memoizer to cache the results of pure functions
+        self.memoizer = None
 
     def interpret(self, statements):
         try:
@@ -31,7 +30,7 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
                 self.execute(statement)
         except RuntimeErr as err:
             self.hadRuntimeError = True
-            LoxError.runtimeError(err)
+            LoxError.runtimeError(err, self.output)
     
     def visitLiteralExpr(self, Expr: Literal):
         return Expr.value
@@ -46,61 +45,16 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             if not self.isTruthy(left):
                 return left
         
-        return self.evaluate(Expr.left)
+        return self.evaluate(Expr.right)
     
     def visitGroupingExpr(self, Expr: Grouping):
         return self.evaluate(Expr.expression)
     
     def visitUnaryExpr(self, Expr: Unary):
-        right = self.evaluate(Expr.right)
-
-        if Expr.operator.type == TokenType.MINUS:
-            self.checkNumberOperand(Expr.operator, right)
-            return -float(right)
-        elif Expr.operator.type == TokenType.BANG:
-            return not self.isTruthy(right)
-
-        return None
+        return Expr.operation(Expr.operator, self.evaluate(Expr.right))
     
     def visitBinaryExpr(self, Expr: Binary):
-        left = self.evaluate(Expr.left)
-        right = self.evaluate(Expr.right)
-
-        if Expr.operator.type == TokenType.MINUS:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) - float(right)
-        if Expr.operator.type == TokenType.PLUS:
-            if type(left) == float and type(right) == float:
-                return float(left) + float(right)
-            if type(left) == str and type(right) == str:
-                return str(left) + str(right)
-            raise RuntimeErr(Expr.operator, "Operands must be 2 numbers or 2 strings")
-        if Expr.operator.type == TokenType.SLASH:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) / float(right)
-        if Expr.operator.type == TokenType.STAR:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) * float(right)
-        
-        if Expr.operator.type == TokenType.GREATER:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) > float(right)
-        if Expr.operator.type == TokenType.GREATER_EQUAL:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) >= float(right)
-        if Expr.operator.type == TokenType.LESS:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) < float(right)
-        if Expr.operator.type == TokenType.LESS_EQUAL:
-            self.checkNumberOperands(Expr.operator, left, right)
-            return float(left) <= float(right)
-        
-        if Expr.operator.type == TokenType.BANG_EQUAL:
-            return not self.isEqual(left, right)
-        if Expr.operator.type == TokenType.EQUAL_EQUAL:
-            return self.isEqual(left, right)
-        
-        return None
+        return Expr.operation(Expr.operator, self.evaluate(Expr.left), self.evaluate(Expr.right))
     
     def visitCallExpr(self, Expr: Call):
         callee = self.evaluate(Expr.callee)
@@ -109,22 +63,38 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         for argument in Expr.arguments:
             arguments.append(self.evaluate(argument))
 
+        # Each call site remembers the last callee that passed the checks
+        if callee is not Expr.function:
+            self.checkCall(callee, arguments, Expr.paren)
+            Expr.function = callee
+        try:
+            return callee.call(self, arguments)
+        except NativeError as err:
+            raise RuntimeErr(Expr.paren, err.message)
+
+    def checkCall(self, callee, arguments, paren: Token):
         if not issubclass(type(callee), LoxCallable):
-            raise RuntimeErr(Expr.paren, "Can only call functions and classes")
+            raise RuntimeErr(paren, "Can only call functions and classes")
         
         function = callee
         if len(arguments) != function.arity():
-            raise RuntimeErr(Expr.paren, "Expected " + str(function.arity()) + " arguments but got " + str(len(arguments)) + " instead.")
-        return function.call(self, arguments)
+            raise RuntimeErr(paren, "Expected " + str(function.arity()) + " arguments but got " + str(len(arguments)) + " instead.")
     
     def visitVariableExpr(self, Expr: Variable):
         return self.lookUpVariable(Expr.name, Expr)
 
     def lookUpVariable(self, name: Token, Expr: Expr):
-        if str(Expr) not in self.local_scope:
-            return self.global_scope.get(name)
-        distance = locals[str(Expr)]
-        return self.environment.getAt(distance, name.lexeme)
+        if Expr.depth is None:
+            return self.globalCell(Expr).value
+        return self.environment.getAt(Expr.depth, Expr.slot)
+
+    # Inline cache for Variable and Assign nodes resolved to a global
+    def globalCell(self, Expr: Expr):
+        globals = self.global_scope
+        if Expr.version != globals.version:
+            Expr.cell = globals.cell(Expr.name)
+            Expr.version = globals.version
+        return Expr.cell
 
     
     def visitExpressionStmt(self, Stmt: Expression):
@@ -132,24 +102,43 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
 
     def visitFunctionStmt(self, Stmt: Function):
         function = LoxFunction(Stmt, self.environment)
+        if self.memoizer is not None:
+            function = self.memoizer.wrap(Stmt, function)
         self.environment.define(Stmt.name.lexeme, function)
 
     def visitIfStmt(self, Stmt: If):
         if self.isTruthy(self.evaluate(Stmt.condition)):
-            self.execute(Stmt.thenBranch)
+            return self.execute(Stmt.thenBranch)
         elif Stmt.elseBranch is not None:
-            self.execute(Stmt.elseBranch)
+            return self.execute(Stmt.elseBranch)
     
     def visitPrintStmt(self, Stmt: Print):
         value = self.evaluate(Stmt.expression)
-        print(self.stringify(value))
+        print(self.stringify(value), file=self.output)
 
     def visitReturnStmt(self, Stmt: Return):
         value = None
-        if Stmt.value != None:
+        if type(Stmt.value) is Call:
+            callee = self.evaluate(Stmt.value.callee)
+            arguments = [self.evaluate(argument) for argument in Stmt.value.arguments]
+            if callee is not Stmt.value.function:
+                self.checkCall(callee, arguments, Stmt.value.paren)
+                Stmt.value.function = callee
+            if type(callee) is LoxFunction:
+                self.tailFunction = callee
+                self.tailArguments = arguments
+                return TAIL_CALL
+            if callee.memoized:
+                return callee.tailCall(self, arguments)
+            try:
+                value = callee.call(self, arguments)
+            except NativeError as err:
+                raise RuntimeErr(Stmt.value.paren, err.message)
+        elif Stmt.value != None:
             value = self.evaluate(Stmt.value)
         
-        raise ReturnBreak(value)
+        self.returnValue = value
+        return RETURNED
     
     def visitVarStmt(self, Stmt: Var):
         value = None
@@ -160,20 +149,22 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     
     def visitWhileStmt(self, Stmt: While):
         while self.isTruthy(self.evaluate(Stmt.condition)):
-            self.execute(Stmt.body)
+            status = self.execute(Stmt.body)
+            if status is not None:
+                return status
 
     def visitAssignExpr(self, Expr: Assign):
         value = self.evaluate(Expr.value)
         
-        if str(Expr) not in self.local_scope:
-            self.global_scope.assign(Expr.name, value)
-        distance = self.local_scope[str(Expr)]
-        self.environment.assignAt(distance, Expr.name, value)
+        if Expr.depth is None:
+            self.globalCell(Expr).value = value
+        else:
+            self.environment.assignAt(Expr.depth, Expr.slot, value)
         
         return value
     
     def visitBlockStmt(self, Stmt: Block):
-        self.executeBlock(Stmt.statements, Environment(self.environment))
+        return self.executeBlock(Stmt.statements, Environment(self.environment))
     
     def isTruthy(self, object):
         if object is None:
@@ -182,13 +173,6 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             return object
         return True
     
-    def isEqual(self, a, b):
-        if a is None and b is None:
-            return True
-        if a is None:
-            return False
-        return a == b
-    
     def stringify(self, object):
         if object is None:
             return "nil"
@@ -199,31 +183,20 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             return text
         return str(object)
     
-    def checkNumberOperand(self, operator: Token, operand):
-        if type(operand) == float:
-            return
-        raise RuntimeErr(operator, "Operand must be a number")
-    
-    def checkNumberOperands(self, operator: Token, left, right):
-        if type(left) == float and type(right) == float:
-            return
-        raise RuntimeErr(operator, "Operands must be a number")
-    
     def evaluate(self, Expr: Expr):
         return Expr.accept(self)
     
     def execute(self, stmt: Stmt):
-        stmt.accept(self)
-    
-    def resolve(self, expr: Expr, depth: int):
-        self.local_scope[str(expr)] = depth
+        return stmt.accept(self)
     
     def executeBlock(self, statements, environment: Environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                status = self.execute(statement)
+                if status is not None:
+                    return status
         finally:
             self.environment = previous
     
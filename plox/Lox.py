@@ -1,40 +1,233 @@
-import argparse
-from pathlib import Path
-from Scanner import Scanner
-from Parser import Parser
-from AstPrinter import AstPrinter
-from Interpreter import Interpreter
-from Resolver import Resolver
+import os
+import sys
+
+# Everything else is imported by the code paths that need it, so a script
+# run from the AST cache never loads the scanner, parser, resolver, other
+# backends or argparse. See benchmark/BenchStartup.py.
+
+# Defaults of the command line options, also the namespace argparse fills in
+class Options:
+    f = None
+    b = 'tree'
+    O = False
+    s = 'char'
+    stream = False
+    no_cache = False
+    cache_stats = False
+    arena = False
+    memoize = False
+    memo_size = 1024
+    memo_eviction = 'lru'
+    memo_stats = False
+    profile = None
+    profile_interval = 1.0
+    profile_output = None
+    snapshot = None
+    save_snapshot = None
 
 class Lox:
     hadError = False
-    interpreter = Interpreter()
+    optimize = False
+    eliminated = 0
+    cache = None
+    scanner = 'char'
+    stream = False
+    arena = False
+    memoizer = None
+    profiler = None
+    interpreter = None
 
     @staticmethod
     def main():
-        parser = argparse.ArgumentParser(usage="Usage: python Lox.py -f [script]")
-        parser.add_argument('-f', type=str, help="Provide a valid file path")
-        args = parser.parse_args()
-        if (args.f):
+        args = Lox.parseArgs(sys.argv[1:])
+        Lox.optimize = args.O
+        Lox.arena = args.arena
+        Lox.scanner = args.s
+        if args.f and not args.no_cache and not args.arena and not args.stream:
+            from AstCache import AstCache
+            Lox.cache = AstCache("O" if args.O else "")
+        if args.profile == 'trace':
+            from Profiler import TracingProfiler
+            Lox.profiler = TracingProfiler()
+        elif args.profile == 'sample':
+            from Profiler import SamplingProfiler
+            Lox.profiler = SamplingProfiler(args.profile_interval / 1000)
+        if Lox.profiler is not None:
+            Lox.interpreter = Lox.profiler.createInterpreter()
+        elif args.b == 'vm':
+            from VM import VM
+            Lox.interpreter = VM()
+        elif args.b == 'closure':
+            from ClosureCompiler import ClosureCompiler
+            Lox.interpreter = ClosureCompiler()
+        elif not args.arena:
+            # --arena builds its interpreter once the arena is parsed
+            from Interpreter import Interpreter
+            Lox.interpreter = Interpreter()
+        if args.memoize:
+            from Memoizer import Memoizer
+            Lox.memoizer = Memoizer(args.memo_size, args.memo_eviction)
+            Lox.interpreter.memoizer = Lox.memoizer
+        if args.snapshot:
+            Lox.restoreSnapshot(args.snapshot)
+        if args.f and args.stream:
+            Lox.runStream(args.f)
+        elif (args.f):
             Lox.runFile(args.f)
         else:
             Lox.runPrompt()
+        if Lox.optimize and Lox.cache is not None and Lox.cache.hits:
+            # The optimizer didn't run, the cached tree was optimized when stored
+            print("[optimizer] loaded the already optimized tree from the AST cache", file=sys.stderr)
+        elif Lox.optimize:
+            print("[optimizer] eliminated " + str(Lox.eliminated) + " nodes", file=sys.stderr)
+        if args.cache_stats and Lox.cache is not None:
+            print(Lox.cache.stats(), file=sys.stderr)
+        if args.memo_stats and Lox.memoizer is not None:
+            print(Lox.memoizer.stats(), file=sys.stderr)
+        if Lox.profiler is not None:
+            print(Lox.profiler.report(), file=sys.stderr)
+            Lox.profiler.writeStacks(args.profile_output or os.path.splitext(args.f)[0] + '.folded')
+        if args.save_snapshot:
+            Lox.saveSnapshot(args.save_snapshot)
+
+    @staticmethod
+    def parseArgs(argv):
+        # Running a script or the REPL with no other options skips argparse
+        if not argv:
+            return Options()
+        if len(argv) == 2 and argv[0] == '-f' and not argv[1].startswith('-'):
+            args = Options()
+            args.f = argv[1]
+            return args
+
+        import argparse
+        from Memoizer import EVICTION_POLICIES
+        from Profiler import PROFILE_MODES
+        # Defaults come from Options, argparse only sets missing attributes
+        parser = argparse.ArgumentParser(usage="Usage: python Lox.py -f [script]")
+        parser.add_argument('-f', type=str, help="Provide a valid file path")
+        parser.add_argument('-b', type=str, choices=['tree', 'closure', 'vm'], help="Execution backend: tree-walking interpreter, closure compiler or bytecode vm")
+        parser.add_argument('-O', action='store_true', help="Fold constants and prune dead branches before resolving")
+        parser.add_argument('-s', type=str, choices=['char', 'regex'], help="Scanner: character at a time or single master regex")
+        parser.add_argument('--stream', action='store_true', help="Read, parse and run the script one top-level declaration at a time")
+        parser.add_argument('--no-cache', action='store_true', help="Always rescan and reparse instead of using __loxcache__")
+        parser.add_argument('--cache-stats', action='store_true', help="Report AST cache hits and misses on stderr")
+        parser.add_argument('--arena', action='store_true', help="Parse into a flat AstArena and interpret integer node handles")
+        parser.add_argument('--memoize', action='store_true', help="Cache results of functions found to be pure")
+        parser.add_argument('--memo-size', type=int, help="Maximum cached results per memoized function")
+        parser.add_argument('--memo-eviction', type=str, choices=EVICTION_POLICIES, help="Which cached result to drop when a memoized function's cache is full")
+        parser.add_argument('--memo-stats', action='store_true', help="Report memoization hits, misses and evictions on stderr")
+        parser.add_argument('--profile', type=str, choices=PROFILE_MODES, help="Profile functions and lines by tracing every statement or by sampling the stack")
+        parser.add_argument('--profile-interval', type=float, help="Milliseconds between two samples of --profile sample")
+        parser.add_argument('--profile-output', type=str, help="Collapsed stacks file for flame graph tools, default the script path with a .folded suffix")
+        parser.add_argument('--snapshot', type=str, help="Start with the globals saved in this heap snapshot")
+        parser.add_argument('--save-snapshot', type=str, help="Save the globals to this heap snapshot after running")
+        args = parser.parse_args(argv, namespace=Options())
+        if args.arena and (not args.f or args.stream or args.O or args.b != 'tree'):
+            parser.error("--arena needs -f and the tree backend, without -O or --stream")
+        if args.memoize and (not args.f or args.stream or args.arena or args.b != 'tree'):
+            parser.error("--memoize needs -f and the tree backend, without --arena or --stream")
+        if args.profile and (not args.f or args.stream or args.arena or args.b != 'tree'):
+            parser.error("--profile needs -f and the tree backend, without --arena or --stream")
+        if (args.snapshot or args.save_snapshot) and (args.arena or args.memoize or args.profile or args.b != 'tree'):
+            parser.error("--snapshot and --save-snapshot need the tree backend, without --arena, --memoize or --profile")
+        if args.profile_interval <= 0:
+            parser.error("--profile-interval must be positive")
+        if args.memo_size < 1:
+            parser.error("--memo-size must be at least 1")
+        return args
     
+    @staticmethod
+    def restoreSnapshot(path: str):
+        from HeapSnapshot import HeapSnapshot, SnapshotError
+        try:
+            HeapSnapshot.restore(Lox.interpreter, path)
+        except SnapshotError as err:
+            raise SystemExit("Invalid snapshot: " + str(err))
+
+    @staticmethod
+    def saveSnapshot(path: str):
+        from HeapSnapshot import HeapSnapshot, SnapshotError
+        if Lox.hadError or Lox.interpreter.hadRuntimeError:
+            raise SystemExit("Not saving a snapshot of a script that failed")
+        try:
+            HeapSnapshot.save(Lox.interpreter, path)
+        except (SnapshotError, OSError) as err:
+            raise SystemExit("Can't save snapshot: " + str(err))
+
     @staticmethod
     def runFile(file_path: str):
-        p = Path(file_path)
-        if not p.exists() and not p.is_file():
+        if not os.path.isfile(file_path):
             raise SystemExit("Invalid file path: " + file_path)
         
-        with p.open() as f:
+        with open(file_path) as f:
             file = f.read()
-        Lox.run(file)
+
+        if Lox.arena:
+            Lox.runArena(file)
+        elif Lox.cache is None:
+            Lox.run(file)
+        else:
+            statements = Lox.cache.load(file_path, file)
+            if statements is None:
+                statements = Lox.compile(file)
+                if statements is not None:
+                    Lox.cache.store(file_path, file, statements)
+            if statements is not None:
+                Lox.execute(statements)
 
         if Lox.hadError:
             SyntaxError("There was an error in compiling the code")
-        if Lox.interpreter.hadRuntimeError:
+        if Lox.interpreter is not None and Lox.interpreter.hadRuntimeError:
             RuntimeError("There was an error in running the code")
     
+    @staticmethod
+    def runArena(source: str):
+        from AstArena import AstArena, ArenaParser
+        from ArenaResolver import ArenaResolver
+        from ArenaInterpreter import ArenaInterpreter
+        arena = AstArena()
+        parser = ArenaParser(Lox.scan(source), arena)
+        statements = parser.parse()
+
+        if parser.hadError:
+            Lox.hadError = True
+            return
+
+        resolver = ArenaResolver(arena)
+        resolver.resolveStmts(statements)
+
+        if resolver.hadError:
+            Lox.hadError = True
+            return
+
+        Lox.interpreter = ArenaInterpreter(arena)
+        Lox.interpreter.interpret(statements)
+
+    @staticmethod
+    def runStream(file_path: str):
+        from RegexScanner import StreamScanner
+        from TokenStream import TokenStream
+        from Parser import Parser
+        if not os.path.isfile(file_path):
+            raise SystemExit("Invalid file path: " + file_path)
+
+        with open(file_path) as f:
+            parser = Parser(TokenStream(StreamScanner(f).scanTokens()))
+            for statement in parser.parseEach():
+                if parser.hadError:
+                    Lox.hadError = True
+                    parser.hadError = False
+                    return
+
+                statements = Lox.prepare([statement])
+                if statements is None:
+                    return
+                Lox.interpreter.interpret(statements)
+                if Lox.interpreter.hadRuntimeError:
+                    return
+
     @staticmethod
     def runPrompt():
         while True:
@@ -48,8 +241,35 @@ class Lox:
     
     @staticmethod
     def run(source: str):
-        scanner = Scanner(source)
-        tokens = scanner.scanTokens()
+        statements = Lox.compile(source)
+        if statements is not None:
+            Lox.execute(statements)
+
+    @staticmethod
+    def execute(statements):
+        if Lox.memoizer is not None:
+            Lox.memoizer.analyze(statements)
+        if Lox.profiler is None:
+            Lox.interpreter.interpret(statements)
+            return
+        Lox.profiler.start()
+        try:
+            Lox.interpreter.interpret(statements)
+        finally:
+            Lox.profiler.stop()
+
+    @staticmethod
+    def scan(source: str):
+        if Lox.scanner == 'regex':
+            from RegexScanner import RegexScanner
+            return RegexScanner(source).scanTokens()
+        from Scanner import Scanner
+        return Scanner(source).scanTokens()
+
+    @staticmethod
+    def compile(source: str):
+        from Parser import Parser
+        tokens = Lox.scan(source)
 
         parser = Parser(tokens)
         statements = parser.parse()
@@ -57,17 +277,28 @@ class Lox:
         if parser.hadError:
             Lox.hadError = True
             parser.hadError = False
-            return
-        
-        resolver = Resolver(Lox.interpreter)
+            return None
+
+        return Lox.prepare(statements)
+
+    @staticmethod
+    def prepare(statements):
+        from Resolver import Resolver
+        if Lox.optimize:
+            from Optimizer import Optimizer
+            optimizer = Optimizer()
+            statements = optimizer.optimize(statements)
+            Lox.eliminated += optimizer.eliminated
+
+        resolver = Resolver()
         resolver.resolveStmts(statements)
 
         if resolver.hadError:
             Lox.hadError = True
             resolver.hadError = False
-            return
+            return None
         
-        Lox.interpreter.interpret(statements)
+        return statements
 
 
 if __name__ == '__main__':
@@ -0,0 +1,21 @@
+from array import array
+
+# A contiguous buffer of float64 numbers, created and processed in bulk by
+# the array natives.
+class LoxArray:
+    __slots__ = ('values',)
+
+    def __init__(self, values: array):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __str__(self):
+        items = []
+        for value in self.values:
+            text = str(value)
+            if text.endswith('.0'):
+                text = text[:-2]
+            items.append(text)
+        return "[" + ", ".join(items) + "]"
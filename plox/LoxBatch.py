@@ -0,0 +1,119 @@
+import argparse
+import glob
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from LoxRuntime import LoxRuntime, BACKENDS
+
+# Exercises scanning, parsing, resolving, calls and printing once per worker
+WARMUP = "fun f(n) { if (n < 1) return n; return f(n - 1) + 1; } var a = f(3); print a;"
+
+# Backend of the scripts run by this worker process
+backend = 'tree'
+
+def warm(workerBackend: str):
+    global backend
+    backend = workerBackend
+    LoxRuntime(backend).run(WARMUP)
+
+def ready(index: int):
+    return os.getpid()
+
+def runFile(path: str):
+    return LoxRuntime(backend).run(Path(path).read_text(), path)
+
+# Runs many .lox files on a pool of worker processes. Every worker imports
+# and warms up the interpreter once and then runs its share of the scripts,
+# each in a fresh LoxRuntime, so a script costs its own run time instead of
+# a Python startup. Outputs are captured per script and printed in input
+# order, or written to one file per script with --out.
+class LoxBatch:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python LoxBatch.py [-j workers] [--out dir] paths...")
+        parser.add_argument('paths', nargs='+', help="Scripts, directories of scripts or glob patterns like ../test_code/*.lox")
+        parser.add_argument('-j', type=int, default=os.cpu_count(), help="Number of worker processes")
+        parser.add_argument('-b', type=str, choices=list(BACKENDS), default='tree', help="Execution backend")
+        parser.add_argument('--chunksize', type=int, help="Scripts sent to a worker at a time, by default a quarter of an even share")
+        parser.add_argument('--out', type=str, help="Write each script's output to a file in this directory instead of printing it")
+        parser.add_argument('-q', action='store_true', help="Only print failures and the summary")
+        args = parser.parse_args()
+        if args.j < 1:
+            parser.error("-j must be at least 1")
+        if args.chunksize is not None and args.chunksize < 1:
+            parser.error("--chunksize must be at least 1")
+
+        files = LoxBatch.collect(args.paths)
+        if not files:
+            raise SystemExit("No .lox files found")
+        if args.out:
+            Path(args.out).mkdir(parents=True, exist_ok=True)
+        chunksize = args.chunksize or max(1, len(files) // (args.j * 4))
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.j, initializer=warm, initargs=(args.b,)) as pool:
+            # Start and warm every worker before timing the scripts
+            list(pool.map(ready, range(args.j)))
+            warmed = time.perf_counter()
+            results = list(pool.map(runFile, files, chunksize=chunksize))
+            elapsed = time.perf_counter() - warmed
+
+        outputs = LoxBatch.outputPaths(files, args.out) if args.out else None
+        failures = 0
+        for i, result in enumerate(results):
+            if not result.ok():
+                failures += 1
+                print("FAIL " + result.name + ": " + (result.compileError or result.output.strip()), file=sys.stderr)
+            if args.out:
+                outputs[i].parent.mkdir(parents=True, exist_ok=True)
+                outputs[i].write_text(result.output)
+            elif not args.q:
+                print("== " + result.name)
+                sys.stdout.write(result.output)
+
+        latencies = sorted(result.compileSeconds + result.runSeconds for result in results)
+        print(str(len(results)) + " scripts, " + str(failures) + " failed, " + str(args.j) + " workers (started in " +
+              str(round((warmed - start) * 1000)) + " ms)", file=sys.stderr)
+        print("throughput " + str(round(len(results) / elapsed, 1)) + " scripts/s over " + str(round(elapsed, 3)) + " s", file=sys.stderr)
+        print("latency ms  p50 " + LoxBatch.percentile(latencies, 50) + "  p90 " + LoxBatch.percentile(latencies, 90) +
+              "  p99 " + LoxBatch.percentile(latencies, 99) + "  max " + str(round(latencies[-1] * 1000, 2)), file=sys.stderr)
+        if failures:
+            raise SystemExit(1)
+
+    @staticmethod
+    def collect(paths):
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(sorted(glob.glob(os.path.join(path, '*.lox'))))
+            elif os.path.isfile(path):
+                files.append(path)
+            else:
+                files.extend(sorted(glob.glob(path, recursive=True)))
+        # A script named twice, e.g. by a directory and a glob, runs once
+        unique = {}
+        for file in files:
+            unique.setdefault(os.path.realpath(file), file)
+        return list(unique.values())
+
+    # Mirrors the scripts' directories below their common parent under out,
+    # so a/b.lox and a_b.lox get distinct out/a/b.lox.out and out/a_b.lox.out
+    @staticmethod
+    def outputPaths(files, out: str):
+        paths = [os.path.realpath(file) for file in files]
+        root = os.path.commonpath([os.path.dirname(path) for path in paths])
+        return [Path(out, os.path.relpath(path, root) + ".out") for path in paths]
+
+    # Nearest-rank percentile of sorted seconds, in milliseconds
+    @staticmethod
+    def percentile(values, percent: float):
+        index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+        return str(round(values[index] * 1000, 2))
+
+
+if __name__ == '__main__':
+    LoxBatch.main()
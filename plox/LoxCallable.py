@@ -1,16 +1,18 @@
-from abc import ABC, abstractmethod
 from Environment import Environment
 from Stmt import Function
-from ReturnBreak import ReturnBreak
+from Completion import RETURNED, TAIL_CALL
+
+# A plain base class rather than an ABC, the backends check
+# isinstance(callee, LoxCallable) on every call
+class LoxCallable:
+    # Set by MemoizedFunction, which runs tail calls through tailCall
+    memoized = False
 
-class LoxCallable(ABC):
-    @abstractmethod
     def call(self, interpreter, arguments):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def arity(self):
-        pass
+        raise NotImplementedError
 
 class LoxFunction(LoxCallable):
     def __init__(self, declaration: Function, closure: Environment):
@@ -18,18 +20,21 @@ class LoxFunction(LoxCallable):
         self.closure = closure
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
-        
-        try:
-            interpreter.executeBlock(self.declaration.body, environment)
-        except ReturnBreak as returnValue:
-            return returnValue.value
-        return None
+        function = self
+        while True:
+            environment = Environment(function.closure, list(arguments))
+            status = interpreter.executeBlock(function.declaration.body, environment)
+            if status == TAIL_CALL:
+                # Run the callee of `return f(...)` in place of this frame
+                function = interpreter.tailFunction
+                arguments = interpreter.tailArguments
+                continue
+            if status == RETURNED:
+                return interpreter.returnValue
+            return None
     
     def arity(self):
         return len(self.declaration.params)
     
     def __str__(self):
-        return "<fn " + self.declaration.name.lexeme + ">"
\ No newline at end of file
+        return "<fn " + self.declaration.name.lexeme + ">"
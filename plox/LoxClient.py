@@ -0,0 +1,67 @@
+import argparse
+import json
+import socket
+import sys
+from LoxProtocol import REQUEST, OUTPUT, DONE, DEFAULT_SOCKET, readFrame, writeJson
+
+# Exit statuses for compile and runtime errors, as in clox
+EXIT_COMPILE = 65
+EXIT_RUNTIME = 70
+
+# Thin client of LoxServer: sends a script, prints its output as it arrives
+# and exits with a status telling whether it compiled and ran. Only imports
+# the protocol, not the interpreter, so it starts quickly.
+class LoxClient:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python LoxClient.py [--socket path] [-f script]")
+        parser.add_argument('-f', type=str, help="Script to run, read from stdin when omitted")
+        parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET, help="Path of the LoxServer socket")
+        parser.add_argument('--time', action='store_true', help="Report the server's compile and run times on stderr")
+        args = parser.parse_args()
+
+        if args.f:
+            with open(args.f) as f:
+                source = f.read()
+        else:
+            source = sys.stdin.read()
+
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(args.socket)
+        except OSError as err:
+            raise SystemExit("Can't connect to LoxServer at " + args.socket + ": " + err.strerror)
+
+        with connection, connection.makefile('rb') as reader, connection.makefile('wb') as writer:
+            writeJson(writer, REQUEST, {"name": args.f or "<stdin>", "source": source})
+            writer.flush()
+            done = LoxClient.receive(reader)
+
+        if args.time:
+            print("[server] compile " + str(round(done["compileSeconds"] * 1000, 2)) + " ms, run " +
+                  str(round(done["runSeconds"] * 1000, 2)) + " ms", file=sys.stderr)
+        if done["error"]:
+            print(done["error"], file=sys.stderr)
+        if done["status"] == "compile":
+            sys.exit(EXIT_COMPILE)
+        if done["status"] != "ok":
+            sys.exit(EXIT_RUNTIME)
+
+    # Copies OUTPUT frames to stdout until the DONE frame and returns it
+    @staticmethod
+    def receive(reader):
+        while True:
+            frame = readFrame(reader)
+            if frame is None:
+                raise SystemExit("LoxServer closed the connection")
+            kind, payload = frame
+            if kind == OUTPUT:
+                sys.stdout.write(payload.decode())
+                sys.stdout.flush()
+            elif kind == DONE:
+                return json.loads(payload)
+
+
+if __name__ == '__main__':
+    LoxClient.main()
@@ -3,8 +3,8 @@ from RuntimeErr import RuntimeErr
 
 class LoxError():
     @staticmethod
-    def runtimeError(err: RuntimeErr):
-        print(err.getMessage() + "\n[line " + str(err.token.line) + "]")
+    def runtimeError(err: RuntimeErr, output=None):
+        print(err.getMessage() + "\n[line " + str(err.token.line) + "]", file=output)
 
     @staticmethod
     def error(line_number: int, message: str):
@@ -0,0 +1,53 @@
+import json
+import os
+import struct
+
+# Frames exchanged by LoxServer and LoxClient over a Unix socket: a kind
+# byte, the payload length as a big-endian uint32 and the payload.
+#   client -> server  REQUEST  JSON {"name", "source"}
+#   server -> client  OUTPUT   UTF-8 text printed by the script, any number
+#                     DONE     JSON {"status": "ok" | "compile" | "runtime"
+#                                    | "protocol", "error", "compileSeconds",
+#                                    "runSeconds"}
+REQUEST = b'R'
+OUTPUT = b'O'
+DONE = b'D'
+
+HEADER = struct.Struct('>cI')
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+# Not tempfile.gettempdir(), importing tempfile slows down LoxClient's startup
+DEFAULT_SOCKET = os.path.join(os.environ.get('TMPDIR', '/tmp'), "lox-" + str(os.getuid()) + ".sock")
+
+class ProtocolError(Exception):
+    pass
+
+def writeFrame(stream, kind: bytes, payload: bytes):
+    stream.write(HEADER.pack(kind, len(payload)) + payload)
+
+def writeJson(stream, kind: bytes, value):
+    writeFrame(stream, kind, json.dumps(value).encode())
+
+# Returns (kind, payload), or None when the stream ends between frames
+def readFrame(stream):
+    header = stream.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ProtocolError("Truncated frame header")
+    kind, length = HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ProtocolError("Frame of " + str(length) + " bytes is too large")
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise ProtocolError("Truncated frame payload")
+    return kind, payload
+
+# The {"name", "source"} body of a REQUEST frame; name is optional
+def decodeRequest(payload: bytes):
+    request = json.loads(payload)
+    if type(request) is not dict or type(request.get("source")) is not str:
+        raise ProtocolError("A request must be an object with a string \"source\"")
+    if type(request.get("name", "")) is not str:
+        raise ProtocolError("A request's \"name\" must be a string")
+    return request
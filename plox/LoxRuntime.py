@@ -0,0 +1,132 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Optimizer import Optimizer
+from Interpreter import Interpreter
+from ClosureCompiler import ClosureCompiler
+from VM import VM
+from HeapSnapshot import HeapSnapshot, SnapshotError
+
+BACKENDS = {
+    'tree': Interpreter,
+    'closure': ClosureCompiler,
+    'vm': VM,
+}
+
+class ScriptResult:
+    def __init__(self, name: str):
+        self.name = name
+        # Everything the script printed, runtime error messages included
+        self.output = ""
+        # Message of a scan, parse or resolve error, the script didn't run
+        self.compileError = None
+        self.hadRuntimeError = False
+        self.compileSeconds = 0.0
+        self.runSeconds = 0.0
+        # CPU time of the running thread, without the time spent waiting
+        # for the GIL while other scripts ran
+        self.cpuSeconds = 0.0
+
+    def ok(self):
+        return self.compileError is None and not self.hadRuntimeError
+
+    def __str__(self):
+        status = "ok" if self.ok() else "compile error" if self.compileError else "runtime error"
+        return self.name + ": " + status + " in " + str(round((self.compileSeconds + self.runSeconds) * 1000, 1)) + " ms"
+
+# An isolated Lox instance for embedding: its own interpreter, globals and
+# output buffer, so any number of them can run in one process. Successive
+# run() calls share globals like the lines of the REPL. Output is collected
+# into each ScriptResult unless an output stream is given.
+class LoxRuntime:
+    def __init__(self, backend: str='tree', optimize: bool=False, output=None):
+        self.buffer = io.StringIO() if output is None else None
+        self.output = self.buffer if output is None else output
+        self.interpreter = BACKENDS[backend](self.output)
+        self.optimize = optimize
+
+    def run(self, source: str, name: str="<script>"):
+        result = ScriptResult(name)
+        start = time.perf_counter()
+        cpuStart = time.thread_time()
+        written = self.buffer.tell() if self.buffer is not None else 0
+
+        try:
+            statements = self.compile(source)
+        except SystemError as err:
+            # LoxError reports static errors by raising
+            result.compileError = str(err)
+            statements = None
+        except Exception as err:
+            # e.g. a RecursionError parsing deeply nested source
+            result.compileError = type(err).__name__ + ": " + str(err)
+            statements = None
+        compiled = time.perf_counter()
+        result.compileSeconds = compiled - start
+
+        if statements is not None:
+            self.interpreter.hadRuntimeError = False
+            try:
+                self.interpreter.interpret(statements)
+                result.hadRuntimeError = self.interpreter.hadRuntimeError
+            except Exception as err:
+                # e.g. a RecursionError from deep Lox recursion; fail this
+                # script, not a whole pool or batch of them
+                result.hadRuntimeError = True
+                print(type(err).__name__ + ": " + str(err), file=self.output)
+            result.runSeconds = time.perf_counter() - compiled
+
+        result.cpuSeconds = time.thread_time() - cpuStart
+        if self.buffer is not None:
+            result.output = self.buffer.getvalue()[written:]
+        return result
+
+    # Saves the globals defined so far to a heap snapshot, e.g. after
+    # running a prelude, for restore() in other runtimes or processes
+    def snapshot(self, path: str):
+        if type(self.interpreter) is not Interpreter:
+            raise SnapshotError("Heap snapshots need the tree backend")
+        HeapSnapshot.save(self.interpreter, path)
+
+    def restore(self, path: str):
+        if type(self.interpreter) is not Interpreter:
+            raise SnapshotError("Heap snapshots need the tree backend")
+        return HeapSnapshot.restore(self.interpreter, path)
+
+    def compile(self, source: str):
+        statements = Parser(Scanner(source).scanTokens()).parse()
+        if self.optimize:
+            statements = Optimizer().optimize(statements)
+        Resolver().resolveStmts(statements)
+        return statements
+
+# Runs scripts on a thread pool, each in a fresh LoxRuntime. Scripts run
+# concurrently but, with the GIL, not in parallel.
+class LoxPool:
+    def __init__(self, workers: int=None, backend: str='tree', optimize: bool=False):
+        self.backend = backend
+        self.optimize = optimize
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lox")
+
+    def submit(self, source: str, name: str="<script>"):
+        return self.executor.submit(self.runScript, source, name)
+
+    # Runs a {name: source} mapping and returns the ScriptResults in its order
+    def runAll(self, scripts):
+        futures = [self.submit(source, name) for name, source in scripts.items()]
+        return [future.result() for future in futures]
+
+    def runScript(self, source: str, name: str):
+        return LoxRuntime(self.backend, self.optimize).run(source, name)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from LoxRuntime import LoxRuntime, BACKENDS
+from LoxProtocol import REQUEST, OUTPUT, DONE, DEFAULT_SOCKET, ProtocolError, readFrame, writeFrame, writeJson, decodeRequest
+
+# Exercises scanning, parsing, resolving, calls and printing once at startup
+WARMUP = "fun f(n) { if (n < 1) return n; return f(n - 1) + 1; } var a = f(3); print a;"
+
+# Sends what a script prints to the client as OUTPUT frames. Text is
+# buffered and sent once it reaches FLUSH_SIZE bytes, or by a timer at
+# most FLUSH_SECONDS after it was printed, so chatty scripts don't send a
+# frame per print and output printed before a long computation still
+# arrives while it runs.
+class FrameWriter:
+    FLUSH_SIZE = 4096
+    FLUSH_SECONDS = 0.05
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pending = []
+        self.size = 0
+        # The script's thread and the timer's both send frames
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def write(self, text: str):
+        with self.lock:
+            self.pending.append(text)
+            self.size += len(text)
+            if self.size >= self.FLUSH_SIZE:
+                self.send()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.FLUSH_SECONDS, self.expire)
+                self.timer.daemon = True
+                self.timer.start()
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self.send()
+
+    def expire(self):
+        try:
+            self.flush()
+        except OSError:
+            # The client is gone; the script's next write or DONE reports it
+            pass
+
+    # Called with the lock held
+    def send(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending:
+            payload = "".join(self.pending).encode()
+            self.pending = []
+            self.size = 0
+            writeFrame(self.stream, OUTPUT, payload)
+
+class LoxRequestHandler(socketserver.StreamRequestHandler):
+    # One connection carries any number of requests, each run in a fresh
+    # LoxRuntime so scripts never see each other's globals.
+    def handle(self):
+        try:
+            while True:
+                frame = readFrame(self.rfile)
+                if frame is None:
+                    return
+                kind, payload = frame
+                if kind != REQUEST:
+                    raise ProtocolError("Expected a request frame")
+                self.run(decodeRequest(payload))
+        except (ProtocolError, ValueError) as err:
+            writeJson(self.wfile, DONE, {"status": "protocol", "error": str(err)})
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def run(self, request):
+        output = FrameWriter(self.wfile)
+        runtime = LoxRuntime(self.server.backend, output=output)
+        result = runtime.run(request["source"], request.get("name", "<script>"))
+        status = "compile" if result.compileError else "runtime" if result.hadRuntimeError else "ok"
+        done = {"status": status, "error": result.compileError,
+                "compileSeconds": result.compileSeconds, "runSeconds": result.runSeconds}
+        output.flush()
+        writeJson(self.wfile, DONE, done)
+
+class ThreadingLoxServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ForkingLoxServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+# Keeps a warmed up interpreter resident and runs scripts sent by LoxClient
+# over a Unix socket, so a script costs its own run time instead of a Python
+# startup. Connections are served by threads, or with --fork by children
+# forked from the warm server, which run in parallel and isolate crashes.
+class LoxServer:
+
+    @staticmethod
+    def main():
+        parser = argparse.ArgumentParser(usage="Usage: python LoxServer.py [--socket path] [-b backend] [--fork]")
+        parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET, help="Path of the Unix socket to listen on")
+        parser.add_argument('-b', type=str, choices=list(BACKENDS), default='tree', help="Execution backend")
+        parser.add_argument('--fork', action='store_true', help="Serve each connection in a forked child instead of a thread")
+        args = parser.parse_args()
+
+        LoxRuntime(args.b).run(WARMUP)
+        LoxServer.removeStale(args.socket)
+
+        server = (ForkingLoxServer if args.fork else ThreadingLoxServer)(args.socket, LoxRequestHandler)
+        server.backend = args.b
+        signal.signal(signal.SIGTERM, LoxServer.terminate)
+        print("listening on " + args.socket, file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.unlink(args.socket)
+
+    # Removes the socket of a server that didn't shut down cleanly, but
+    # never takes the path from one that is still listening
+    @staticmethod
+    def removeStale(path: str):
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise SystemExit(path + " exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+        finally:
+            probe.close()
+        raise SystemExit("A LoxServer is already listening on " + path)
+
+    @staticmethod
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+
+
+if __name__ == '__main__':
+    LoxServer.main()
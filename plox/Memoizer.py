@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from LoxCallable import LoxCallable, LoxFunction
+from PurityAnalyzer import PurityAnalyzer
+from Natives import NATIVES
+from Completion import RETURNED, TAIL_CALL
+
+EVICTION_POLICIES = ('lru', 'fifo')
+
+# Returned by MemoizedFunction.lookup when nothing is cached, nil can be
+MISSING = object()
+
+# Caches the results of a pure LoxFunction by argument values. The cache
+# holds at most size entries; when full, 'lru' evicts the least recently
+# used entry and 'fifo' the oldest inserted one.
+class MemoizedFunction(LoxCallable):
+    memoized = True
+
+    def __init__(self, function: LoxFunction, size: int, eviction: str):
+        self.function = function
+        self.size = size
+        self.refresh = eviction == 'lru'
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def call(self, interpreter, arguments):
+        key = self.key(arguments)
+        if key is None:
+            return self.function.call(interpreter, arguments)
+
+        value = self.lookup(key)
+        if value is not MISSING:
+            return value
+
+        value = self.function.call(interpreter, arguments)
+        results = self.results
+        results[key] = value
+        if len(results) > self.size:
+            results.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    # A call in tail position: a cached result returns at once, a miss runs
+    # the wrapped function in the caller's frame like any other tail call,
+    # so only the outermost call of a tail recursion caches its result
+    def tailCall(self, interpreter, arguments):
+        key = self.key(arguments)
+        value = MISSING if key is None else self.lookup(key)
+        if value is MISSING:
+            interpreter.tailFunction = self.function
+            interpreter.tailArguments = arguments
+            return TAIL_CALL
+        interpreter.returnValue = value
+        return RETURNED
+
+    # The cached result for key, counted as a hit, or MISSING, counted as a miss
+    def lookup(self, key):
+        results = self.results
+        if key in results:
+            self.hits += 1
+            if self.refresh:
+                results.move_to_end(key)
+            return results[key]
+        self.misses += 1
+        return MISSING
+
+    # Numbers and strings are their own key. nil, booleans and zero are
+    # tagged so true doesn't hit the entry for 1 and -0 not the one for 0.
+    # Other values, e.g. functions, aren't cached.
+    def key(self, arguments):
+        key = []
+        for argument in arguments:
+            kind = type(argument)
+            if (kind is float and argument != 0.0) or kind is str:
+                key.append(argument)
+            elif kind is float or kind is bool or argument is None:
+                key.append((kind, repr(argument)))
+            else:
+                return None
+        return tuple(key)
+
+    def arity(self):
+        return self.function.arity()
+
+    def __str__(self):
+        return str(self.function)
+
+# Decides which functions of a program get memoized and keeps their
+# wrappers for reporting.
+class Memoizer:
+    def __init__(self, size: int=1024, eviction: str='lru'):
+        self.size = size
+        self.eviction = eviction
+        self.pure = set()
+        self.functions = []
+
+    def analyze(self, statements):
+        self.pure |= PurityAnalyzer(NATIVES.pureNames()).analyze(statements)
+
+    def wrap(self, declaration, function: LoxFunction):
+        if declaration not in self.pure:
+            return function
+        memoized = MemoizedFunction(function, self.size, self.eviction)
+        self.functions.append(memoized)
+        return memoized
+
+    def stats(self):
+        lines = []
+        for memoized in self.functions:
+            lines.append("[memo] " + memoized.function.declaration.name.lexeme + ": " + str(memoized.hits) + " hits, " +
+                         str(memoized.misses) + " misses, " + str(memoized.evictions) + " evictions")
+        if not lines:
+            lines.append("[memo] no pure functions")
+        return "\n".join(lines)
@@ -0,0 +1,287 @@
+import math
+import operator
+import time
+from array import array
+from itertools import compress
+from LoxCallable import LoxCallable
+from LoxArray import LoxArray
+
+# Raised by natives for bad arguments; the caller reports it as a RuntimeErr
+# at the call's closing paren.
+class NativeError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+class NativeFunction(LoxCallable):
+    def __init__(self, name: str, params: int, function, pure: bool):
+        self.name = name
+        self.params = params
+        self.function = function
+        # Pure natives depend only on their arguments, see PurityAnalyzer
+        self.pure = pure
+
+    def call(self, interpreter, arguments):
+        try:
+            return self.function(*arguments)
+        except (ValueError, OverflowError) as err:
+            raise NativeError(self.name + ": " + str(err))
+
+    def arity(self):
+        return self.params
+
+    def __str__(self):
+        return "<native fun>"
+
+class NativeRegistry:
+    def __init__(self):
+        self.functions = {}
+
+    # Decorator adding a Python function as a global Lox native
+    def register(self, name: str, params: int, pure: bool=True):
+        def decorate(function):
+            self.functions[name] = NativeFunction(name, params, function, pure)
+            return function
+        return decorate
+
+    # define(name, value) is the backend's global definition function
+    def install(self, define):
+        for name, native in self.functions.items():
+            define(name, native)
+
+    def pureNames(self):
+        return frozenset(name for name, native in self.functions.items() if native.pure)
+
+NATIVES = NativeRegistry()
+
+def number(value, name: str):
+    if type(value) is not float:
+        raise NativeError("Argument to " + name + " must be a number.")
+    return value
+
+def string(value, name: str):
+    if type(value) is not str:
+        raise NativeError("Argument to " + name + " must be a string.")
+    return value
+
+def buffer(value, name: str):
+    if type(value) is not LoxArray:
+        raise NativeError("Argument to " + name + " must be an array.")
+    return value.values
+
+def index(values, position, name: str):
+    if type(position) is not float or not position.is_integer():
+        raise NativeError("Index to " + name + " must be an integer.")
+    position = int(position)
+    if position < 0 or position >= len(values):
+        raise NativeError("Index " + str(position) + " out of range for " + name + ".")
+    return position
+
+# Time and randomness
+
+@NATIVES.register("clock", 0, pure=False)
+def clock():
+    return time.time() * 1000
+
+@NATIVES.register("random", 0, pure=False)
+def randomNumber():
+    # Imported on first use, most scripts never pay for it
+    import random
+    return random.random()
+
+# Math
+
+@NATIVES.register("sqrt", 1)
+def sqrt(x):
+    return math.sqrt(number(x, "sqrt"))
+
+@NATIVES.register("abs", 1)
+def absolute(x):
+    return abs(number(x, "abs"))
+
+@NATIVES.register("floor", 1)
+def floor(x):
+    return float(math.floor(number(x, "floor")))
+
+@NATIVES.register("ceil", 1)
+def ceil(x):
+    return float(math.ceil(number(x, "ceil")))
+
+@NATIVES.register("round", 1)
+def roundNumber(x):
+    # Halves round up, not to even as Python's round() does
+    return float(math.floor(number(x, "round") + 0.5))
+
+@NATIVES.register("pow", 2)
+def power(x, y):
+    return math.pow(number(x, "pow"), number(y, "pow"))
+
+@NATIVES.register("min", 2)
+def minimum(x, y):
+    return min(number(x, "min"), number(y, "min"))
+
+@NATIVES.register("max", 2)
+def maximum(x, y):
+    return max(number(x, "max"), number(y, "max"))
+
+@NATIVES.register("sin", 1)
+def sin(x):
+    return math.sin(number(x, "sin"))
+
+@NATIVES.register("cos", 1)
+def cos(x):
+    return math.cos(number(x, "cos"))
+
+@NATIVES.register("exp", 1)
+def exp(x):
+    return math.exp(number(x, "exp"))
+
+@NATIVES.register("log", 1)
+def log(x):
+    return math.log(number(x, "log"))
+
+# Strings
+
+@NATIVES.register("len", 1)
+def length(value):
+    if type(value) is str:
+        return float(len(value))
+    return float(len(buffer(value, "len")))
+
+@NATIVES.register("substr", 3)
+def substr(text, start, end):
+    text = string(text, "substr")
+    return text[int(number(start, "substr")):int(number(end, "substr"))]
+
+@NATIVES.register("indexOf", 2)
+def indexOf(text, part):
+    return float(string(text, "indexOf").find(string(part, "indexOf")))
+
+@NATIVES.register("upper", 1)
+def upper(text):
+    return string(text, "upper").upper()
+
+@NATIVES.register("lower", 1)
+def lower(text):
+    return string(text, "lower").lower()
+
+@NATIVES.register("str", 1)
+def toString(value):
+    if value is None:
+        return "nil"
+    if type(value) is float:
+        text = str(value)
+        if text.endswith('.0'):
+            text = text[:-2]
+        return text
+    return str(value)
+
+@NATIVES.register("num", 1)
+def toNumber(text):
+    try:
+        return float(string(text, "num"))
+    except ValueError:
+        raise NativeError("Can't convert '" + text + "' to a number.")
+
+# Arrays. Creating or changing one is impure since arrays are mutable and
+# shared by reference.
+
+@NATIVES.register("array", 1, pure=False)
+def newArray(size):
+    size = number(size, "array")
+    if size < 0 or not size.is_integer():
+        raise NativeError("Array size must be a non-negative integer.")
+    return LoxArray(array('d', bytes(8 * int(size))))
+
+@NATIVES.register("fill", 2, pure=False)
+def fill(size, value):
+    size = number(size, "fill")
+    if size < 0 or not size.is_integer():
+        raise NativeError("Array size must be a non-negative integer.")
+    return LoxArray(array('d', [number(value, "fill")]) * int(size))
+
+@NATIVES.register("range", 3, pure=False)
+def numberRange(start, stop, step):
+    start = number(start, "range")
+    stop = number(stop, "range")
+    step = number(step, "range")
+    if step == 0:
+        raise NativeError("Range step can't be 0.")
+    count = max(0, math.ceil((stop - start) / step))
+    return LoxArray(array('d', [start + i * step for i in range(count)]))
+
+@NATIVES.register("copy", 1, pure=False)
+def copy(values):
+    return LoxArray(array('d', buffer(values, "copy")))
+
+@NATIVES.register("get", 2)
+def getElement(values, position):
+    values = buffer(values, "get")
+    return values[index(values, position, "get")]
+
+@NATIVES.register("set", 3, pure=False)
+def setElement(values, position, value):
+    values = buffer(values, "set")
+    values[index(values, position, "set")] = number(value, "set")
+    return value
+
+@NATIVES.register("push", 2, pure=False)
+def push(values, value):
+    buffer(values, "push").append(number(value, "push"))
+    return values
+
+@NATIVES.register("slice", 3, pure=False)
+def sliceArray(values, start, end):
+    values = buffer(values, "slice")
+    if type(start) is not float or not start.is_integer() or type(end) is not float or not end.is_integer():
+        raise NativeError("Bounds to slice must be integers.")
+    # Negative bounds count from the end, out of range ones are clamped
+    return LoxArray(values[int(start):int(end)])
+
+# Keeps the elements whose mask element, e.g. from a comparison, isn't 0
+@NATIVES.register("select", 2, pure=False)
+def select(values, mask):
+    values = buffer(values, "select")
+    mask = buffer(mask, "select")
+    if len(values) != len(mask):
+        raise NativeError("Arrays passed to select must have the same length.")
+    return LoxArray(array('d', compress(values, mask)))
+
+# Reductions
+
+@NATIVES.register("sum", 1)
+def total(values):
+    return math.fsum(buffer(values, "sum"))
+
+@NATIVES.register("mean", 1)
+def mean(values):
+    values = buffer(values, "mean")
+    if not values:
+        raise NativeError("Can't take the mean of an empty array.")
+    return math.fsum(values) / len(values)
+
+@NATIVES.register("minOf", 1)
+def minOf(values):
+    values = buffer(values, "minOf")
+    if not values:
+        raise NativeError("Can't take the minimum of an empty array.")
+    return min(values)
+
+@NATIVES.register("maxOf", 1)
+def maxOf(values):
+    values = buffer(values, "maxOf")
+    if not values:
+        raise NativeError("Can't take the maximum of an empty array.")
+    return max(values)
+
+@NATIVES.register("dot", 2)
+def dot(left, right):
+    left = buffer(left, "dot")
+    right = buffer(right, "dot")
+    if len(left) != len(right):
+        raise NativeError("Arrays passed to dot must have the same length.")
+    return math.fsum(map(operator.mul, left, right))
+
+@NATIVES.register("scale", 2, pure=False)
+def scale(values, factor):
+    factor = number(factor, "scale")
+    return LoxArray(array('d', [value * factor for value in buffer(values, "scale")]))
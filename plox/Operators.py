@@ -0,0 +1,121 @@
+import operator as ops
+from array import array
+from itertools import repeat
+from Token import Token, TokenType
+from RuntimeErr import RuntimeErr
+from LoxArray import LoxArray
+
+# Each operation takes the operator token (for error reporting) and its
+# already evaluated operands. The float/float case is checked first since
+# it is by far the most common in arithmetic heavy code.
+
+# Applies function to each pair of elements of two equally long arrays, or
+# of an array and a number repeated for every element, producing a new
+# array. Comparisons produce 1 where they hold and 0 elsewhere.
+def elementwise(operator: Token, function, left, right):
+    if type(left) is LoxArray and type(right) is LoxArray:
+        if len(left.values) != len(right.values):
+            raise RuntimeErr(operator, "Arrays must have the same length")
+        values = map(function, left.values, right.values)
+    elif type(left) is LoxArray and type(right) is float:
+        values = map(function, left.values, repeat(right))
+    elif type(left) is float and type(right) is LoxArray:
+        values = map(function, repeat(left), right.values)
+    else:
+        raise RuntimeErr(operator, "Operands must be numbers or arrays")
+    try:
+        return LoxArray(array('d', values))
+    except ZeroDivisionError:
+        raise RuntimeErr(operator, "Division by zero")
+
+def add(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left + right
+    if type(left) is str and type(right) is str:
+        return left + right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.add, left, right)
+    raise RuntimeErr(operator, "Operands must be 2 numbers or 2 strings")
+
+def subtract(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left - right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.sub, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def multiply(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left * right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.mul, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def divide(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left / right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.truediv, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def greater(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left > right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.gt, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def greaterEqual(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left >= right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.ge, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def less(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left < right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.lt, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def lessEqual(operator: Token, left, right):
+    if type(left) is float and type(right) is float:
+        return left <= right
+    if type(left) is LoxArray or type(right) is LoxArray:
+        return elementwise(operator, ops.le, left, right)
+    raise RuntimeErr(operator, "Operands must be a number")
+
+def equal(operator: Token, left, right):
+    return left == right
+
+def notEqual(operator: Token, left, right):
+    return not (left == right)
+
+def negate(operator: Token, right):
+    if type(right) is float:
+        return -right
+    if type(right) is LoxArray:
+        return LoxArray(array('d', map(ops.neg, right.values)))
+    raise RuntimeErr(operator, "Operand must be a number")
+
+def bang(operator: Token, right):
+    return right is None or right is False
+
+BINARY_OPERATORS = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: divide,
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greaterEqual,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: lessEqual,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.BANG_EQUAL: notEqual,
+}
+
+UNARY_OPERATORS = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: bang,
+}
@@ -0,0 +1,213 @@
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Token import TokenType
+from RuntimeErr import RuntimeErr
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
+
+class NodeCounter(Expr.Visitor, Stmt.Visitor):
+    def count(self, node):
+        if node is None:
+            return 0
+        return node.accept(self)
+
+    def countAll(self, nodes):
+        return sum(self.count(node) for node in nodes)
+
+    def visitAssignExpr(self, Expr: Assign):
+        return 1 + self.count(Expr.value)
+
+    def visitBinaryExpr(self, Expr: Binary):
+        return 1 + self.count(Expr.left) + self.count(Expr.right)
+
+    def visitCallExpr(self, Expr: Call):
+        return 1 + self.count(Expr.callee) + self.countAll(Expr.arguments)
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        return 1 + self.count(Expr.expression)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return 1
+
+    def visitLogicalExpr(self, Expr: Logical):
+        return 1 + self.count(Expr.left) + self.count(Expr.right)
+
+    def visitUnaryExpr(self, Expr: Unary):
+        return 1 + self.count(Expr.right)
+
+    def visitVariableExpr(self, Expr: Variable):
+        return 1
+
+    def visitBlockStmt(self, Stmt: Block):
+        return 1 + self.countAll(Stmt.statements)
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        return 1 + self.count(Stmt.expression)
+
+    def visitFunctionStmt(self, Stmt: Function):
+        return 1 + self.countAll(Stmt.body)
+
+    def visitIfStmt(self, Stmt: If):
+        return 1 + self.count(Stmt.condition) + self.count(Stmt.thenBranch) + self.count(Stmt.elseBranch)
+
+    def visitPrintStmt(self, Stmt: Print):
+        return 1 + self.count(Stmt.expression)
+
+    def visitReturnStmt(self, Stmt: Return):
+        return 1 + self.count(Stmt.value)
+
+    def visitVarStmt(self, Stmt: Var):
+        return 1 + self.count(Stmt.initializer)
+
+    def visitWhileStmt(self, Stmt: While):
+        return 1 + self.count(Stmt.condition) + self.count(Stmt.body)
+
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.eliminated = 0
+        self.counter = NodeCounter()
+
+    def optimize(self, statements):
+        return self.optimizeStmts(statements)
+
+    def optimizeStmts(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = self.optimizeStmt(statement)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def optimizeStmt(self, stmt: Stmt):
+        return stmt.accept(self)
+
+    def optimizeExpr(self, expr: Expr):
+        return expr.accept(self)
+
+    def optimizeBranch(self, stmt: Stmt):
+        # Branches and loop bodies must stay statements even when emptied.
+        optimized = self.optimizeStmt(stmt)
+        if optimized is None:
+            return Block([])
+        return optimized
+
+    def eliminate(self, node):
+        self.eliminated += self.counter.count(node)
+
+    def isTruthy(self, value):
+        return not (value is None or value is False)
+
+    def visitAssignExpr(self, Expr: Assign):
+        Expr.value = self.optimizeExpr(Expr.value)
+        return Expr
+
+    def visitBinaryExpr(self, Expr: Binary):
+        Expr.left = self.optimizeExpr(Expr.left)
+        Expr.right = self.optimizeExpr(Expr.right)
+        if type(Expr.left) != Literal or type(Expr.right) != Literal:
+            return Expr
+
+        operation = BINARY_OPERATORS[Expr.operator.type]
+        try:
+            value = operation(Expr.operator, Expr.left.value, Expr.right.value)
+        except (RuntimeErr, ZeroDivisionError):
+            # Leave it for the interpreter to report at runtime.
+            return Expr
+        self.eliminated += 2
+        return Literal(value)
+
+    def visitCallExpr(self, Expr: Call):
+        Expr.callee = self.optimizeExpr(Expr.callee)
+        Expr.arguments = [self.optimizeExpr(argument) for argument in Expr.arguments]
+        return Expr
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        self.eliminated += 1
+        return self.optimizeExpr(Expr.expression)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return Expr
+
+    def visitLogicalExpr(self, Expr: Logical):
+        Expr.left = self.optimizeExpr(Expr.left)
+        Expr.right = self.optimizeExpr(Expr.right)
+        if type(Expr.left) != Literal:
+            return Expr
+
+        truthy = self.isTruthy(Expr.left.value)
+        if (Expr.operator.type == TokenType.OR) == truthy:
+            self.eliminated += 1
+            self.eliminate(Expr.right)
+            return Expr.left
+
+        self.eliminated += 1
+        self.eliminate(Expr.left)
+        return Expr.right
+
+    def visitUnaryExpr(self, Expr: Unary):
+        Expr.right = self.optimizeExpr(Expr.right)
+        if type(Expr.right) != Literal:
+            return Expr
+
+        operation = UNARY_OPERATORS[Expr.operator.type]
+        try:
+            value = operation(Expr.operator, Expr.right.value)
+        except RuntimeErr:
+            return Expr
+        self.eliminated += 1
+        return Literal(value)
+
+    def visitVariableExpr(self, Expr: Variable):
+        return Expr
+
+    def visitBlockStmt(self, Stmt: Block):
+        Stmt.statements = self.optimizeStmts(Stmt.statements)
+        return Stmt
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        Stmt.expression = self.optimizeExpr(Stmt.expression)
+        return Stmt
+
+    def visitFunctionStmt(self, Stmt: Function):
+        Stmt.body = self.optimizeStmts(Stmt.body)
+        return Stmt
+
+    def visitIfStmt(self, Stmt: If):
+        Stmt.condition = self.optimizeExpr(Stmt.condition)
+        if type(Stmt.condition) != Literal:
+            Stmt.thenBranch = self.optimizeBranch(Stmt.thenBranch)
+            if Stmt.elseBranch is not None:
+                Stmt.elseBranch = self.optimizeBranch(Stmt.elseBranch)
+            return Stmt
+
+        self.eliminated += 2
+        if self.isTruthy(Stmt.condition.value):
+            self.eliminate(Stmt.elseBranch)
+            return self.optimizeStmt(Stmt.thenBranch)
+
+        self.eliminate(Stmt.thenBranch)
+        if Stmt.elseBranch is None:
+            return None
+        return self.optimizeStmt(Stmt.elseBranch)
+
+    def visitPrintStmt(self, Stmt: Print):
+        Stmt.expression = self.optimizeExpr(Stmt.expression)
+        return Stmt
+
+    def visitReturnStmt(self, Stmt: Return):
+        if Stmt.value is not None:
+            Stmt.value = self.optimizeExpr(Stmt.value)
+        return Stmt
+
+    def visitVarStmt(self, Stmt: Var):
+        if Stmt.initializer is not None:
+            Stmt.initializer = self.optimizeExpr(Stmt.initializer)
+        return Stmt
+
+    def visitWhileStmt(self, Stmt: While):
+        Stmt.condition = self.optimizeExpr(Stmt.condition)
+        if type(Stmt.condition) == Literal and not self.isTruthy(Stmt.condition.value):
+            self.eliminate(Stmt)
+            return None
+
+        Stmt.body = self.optimizeBranch(Stmt.body)
+        return Stmt
@@ -3,16 +3,74 @@ from Expr import Expr, Binary, Unary, Literal, Grouping, Variable, Assign, Logic
 from Stmt import Expression, Print, Var, Block, If, While, Function, Return
 from LoxError import LoxError
 
+# Binding power of the binary operators, higher binds tighter. Operators on
+# the same level associate to the left.
+EQUALITY = 1
+COMPARISON = 2
+TERM = 3
+FACTOR = 4
+
+BINARY_PRECEDENCE = {
+    TokenType.BANG_EQUAL: EQUALITY,
+    TokenType.EQUAL_EQUAL: EQUALITY,
+    TokenType.GREATER: COMPARISON,
+    TokenType.GREATER_EQUAL: COMPARISON,
+    TokenType.LESS: COMPARISON,
+    TokenType.LESS_EQUAL: COMPARISON,
+    TokenType.MINUS: TERM,
+    TokenType.PLUS: TERM,
+    TokenType.SLASH: FACTOR,
+    TokenType.STAR: FACTOR,
+}
+
+UNARY_TYPES = frozenset([TokenType.BANG, TokenType.MINUS])
+LITERAL_TYPES = frozenset([TokenType.NUMBER, TokenType.STRING])
+KEYWORD_LITERALS = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+    TokenType.NIL: None,
+}
+
+# Tokens that start a statement, where synchronize() can resume parsing.
+SYNC_TYPES = frozenset([TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN])
+
 class Parser():
     class ParseError(Exception):
         pass
     
     counter = 0
 
+    # Node constructors, looked up on self so ArenaParser can swap in
+    # builders that write to an AstArena instead.
+    Assign = Assign
+    Binary = Binary
+    Call = Call
+    Grouping = Grouping
+    Literal = Literal
+    Logical = Logical
+    Unary = Unary
+    Variable = Variable
+    Block = Block
+    Expression = Expression
+    Function = Function
+    If = If
+    Print = Print
+    Return = Return
+    Var = Var
+    While = While
+
     def __init__(self, tokens):
         self.tokens = tokens
         self.current = 0
         self.hadError = False
+        self.statementParsers = {
+            TokenType.FOR: self.forStatement,
+            TokenType.IF: self.ifStatement,
+            TokenType.PRINT: self.printStatement,
+            TokenType.RETURN: self.returnStatement,
+            TokenType.WHILE: self.whileStatement,
+            TokenType.LEFT_BRACE: self.blockStatement,
+        }
 
     def parse(self):
         statements = []
@@ -21,14 +79,18 @@ class Parser():
         
         return statements
 
+    def parseEach(self):
+        while not self.isAtEnd():
+            yield self.declaration()
+
     def expression(self):
         return self.assignment()
     
     def declaration(self):
         try:
-            if self.match([TokenType.FUN]):
+            if self.match(TokenType.FUN):
                 return self.function("function")
-            if self.match([TokenType.VAR]):
+            if self.match(TokenType.VAR):
                 return self.varDeclaration()
             return self.statement()
         except self.ParseError:
@@ -36,27 +98,19 @@ class Parser():
             return None
     
     def statement(self):
-        if self.match([TokenType.FOR]):
-            return self.forStatement()
-        if self.match([TokenType.IF]):
-            return self.ifStatement()
-        if self.match([TokenType.PRINT]):
-            return self.printStatement()
-        if self.match([TokenType.RETURN]):
-            return self.returnStatement()
-        if self.match([TokenType.WHILE]):
-            return self.whileStatement()
-        if self.match([TokenType.LEFT_BRACE]):
-            return Block(self.block())
+        parse = self.statementParsers.get(self.tokens[self.current].type)
+        if parse is not None:
+            self.current += 1
+            return parse()
         return self.expressionStatement()
     
     def forStatement(self):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
         initializer = None
-        if self.match([TokenType.SEMICOLON]):
+        if self.match(TokenType.SEMICOLON):
             initializer = None
-        elif self.match([TokenType.VAR]):
+        elif self.match(TokenType.VAR):
             initializer = self.varDeclaration()
         else:
             initializer = self.expressionStatement()
@@ -74,14 +128,14 @@ class Parser():
         body = self.statement()
 
         if increment is not None:
-            body = Block([body, Expression(increment)])
+            body = self.Block([body, self.Expression(increment)])
         
         if condition is None:
-            condition = Literal(True)
-        body = While(condition, body)
+            condition = self.Literal(True)
+        body = self.While(condition, body)
 
         if initializer is not None:
-            body = Block([initializer, body])
+            body = self.Block([initializer, body])
         
         return body
     
@@ -92,15 +146,15 @@ class Parser():
 
         thenBranch = self.statement()
         elseBranch = None
-        if self.match([TokenType.ELSE]):
+        if self.match(TokenType.ELSE):
             elseBranch = self.statement()
         
-        return If(condition, thenBranch, elseBranch)
+        return self.If(condition, thenBranch, elseBranch)
     
     def printStatement(self):
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ':' after value.")
-        return Print(value)
+        return self.Print(value)
     
     def returnStatement(self):
         keyword = self.previous()
@@ -109,7 +163,7 @@ class Parser():
             value = self.expression()
         
         self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
-        return Return(keyword, value)
+        return self.Return(keyword, value)
     
     def whileStatement(self):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
@@ -117,22 +171,22 @@ class Parser():
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after while condition.")
         body = self.statement()
 
-        return While(condition, body)
+        return self.While(condition, body)
     
     def varDeclaration(self):
         name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
 
         initializer = None
-        if self.match([TokenType.EQUAL]):
+        if self.match(TokenType.EQUAL):
             initializer = self.expression()
 
         self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration")
-        return Var(name, initializer)
+        return self.Var(name, initializer)
     
     def expressionStatement(self):
         expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ':' after value")
-        return Expression(expr)
+        return self.Expression(expr)
     
     def function(self, kind: str):
         name = self.consume(TokenType.IDENTIFIER, "Expect " + kind + " name.")
@@ -140,7 +194,7 @@ class Parser():
         parameters = []
         if not self.check(TokenType.RIGHT_PAREN):
             parameters.append(self.consume(TokenType.IDENTIFIER, "Expect parameter name"))
-            while self.match([TokenType.COMMA]):
+            while self.match(TokenType.COMMA):
                 if len(parameters) >= 255:
                     self.error(self.peek(), "Can't have more than 255 parameters")
                 parameters.append(self.consume(TokenType.IDENTIFIER, "Expect parameter name"))
@@ -148,8 +202,11 @@ class Parser():
 
         self.consume(TokenType.LEFT_BRACE, "Expect '{' before " + kind + " body.")
         body = self.block()
-        return Function(name, parameters, body)
+        return self.Function(name, parameters, body)
     
+    def blockStatement(self):
+        return self.Block(self.block())
+
     def block(self):
         statements = []
 
@@ -161,13 +218,13 @@ class Parser():
     
     def assignment(self):
         expr = self.orExpr()
-        if self.match([TokenType.EQUAL]):
+        if self.match(TokenType.EQUAL):
             equals = self.previous()
             value = self.assignment()
 
-            if type(expr) == Variable:
-                name = expr.name
-                return Assign(name, value)
+            name = self.assignmentTarget(expr)
+            if name is not None:
+                return self.Assign(name, value)
             
             self.error(equals, "Invalid assignment target")
         
@@ -176,117 +233,97 @@ class Parser():
     def orExpr(self):
         expr = self.andExpr()
 
-        while self.match([TokenType.OR]):
+        while self.match(TokenType.OR):
             operator = self.previous()
             right = self.andExpr()
-            expr = Logical(expr, operator, right)
+            expr = self.Logical(expr, operator, right)
         
         return expr
     
     def andExpr(self):
-        expr = self.equality()
-
-        while self.match([TokenType.AND]):
-            operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-        
-        return expr
-    
-    def equality(self):
-        expr = self.comparison()
-
-        while self.match([TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL]):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    def comparison(self):
-        expr = self.term()
+        expr = self.binary(EQUALITY)
 
-        while self.match([TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL]):
+        while self.match(TokenType.AND):
             operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
+            right = self.binary(EQUALITY)
+            expr = self.Logical(expr, operator, right)
         
         return expr
     
-    def term(self):
-        expr = self.factor()
-
-        while self.match([TokenType.MINUS, TokenType.PLUS]):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    def factor(self):
+    # Parses equality, comparison, term and factor in one loop driven by
+    # BINARY_PRECEDENCE; the trees match one method per level.
+    def binary(self, precedence: int):
         expr = self.unary()
 
-        while self.match([TokenType.SLASH, TokenType.STAR]):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+        while True:
+            operator = self.tokens[self.current]
+            operatorPrecedence = BINARY_PRECEDENCE.get(operator.type, 0)
+            if operatorPrecedence < precedence:
+                return expr
+            self.current += 1
+            right = self.binary(operatorPrecedence + 1)
+            expr = self.Binary(expr, operator, right)
     
     def unary(self):
-        if self.match([TokenType.BANG, TokenType.MINUS]):
-            operator = self.previous()
+        operator = self.tokens[self.current]
+        if operator.type in UNARY_TYPES:
+            self.current += 1
             right = self.unary()
-            return Unary(operator, right)
+            return self.Unary(operator, right)
         
         return self.call()
     
     def call(self):
         expr = self.primary()
 
-        while True:
-            if self.match([TokenType.LEFT_PAREN]):
-                expr = self.finishCall(expr)
-            else:
-                break
+        while self.match(TokenType.LEFT_PAREN):
+            expr = self.finishCall(expr)
         
         return expr
     
+    # The name token of an assignable expression, None for anything else.
+    def assignmentTarget(self, expr: Expr):
+        if type(expr) == Variable:
+            return expr.name
+        return None
+
     def finishCall(self, callee: Expr):
         arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
             arguments.append(self.expression())
-            while self.match([TokenType.COMMA]):
+            while self.match(TokenType.COMMA):
                 if len(arguments) >= 255:
                     self.error(self.peek(), "Can't have more than 255 arguments.")
                 arguments.append(self.expression())
         
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect '(' after arguments.")
-        return Call(callee, paren, arguments)
+        return self.Call(callee, paren, arguments)
     
     def primary(self):
-        if self.match([TokenType.FALSE]):
-            return Literal(False)
-        if self.match([TokenType.TRUE]):
-            return Literal(True)
-        if self.match([TokenType.NIL]):
-            return Literal(None)
-        if self.match([TokenType.NUMBER, TokenType.STRING]):
-            return Literal(self.previous().literal)
-        if self.match([TokenType.IDENTIFIER]):
-            return Variable(self.previous())
-        if self.match([TokenType.LEFT_PAREN]):
+        token = self.tokens[self.current]
+        type = token.type
+        if type is TokenType.IDENTIFIER:
+            self.current += 1
+            return self.Variable(token)
+        if type in LITERAL_TYPES:
+            self.current += 1
+            return self.Literal(token.literal)
+        if type in KEYWORD_LITERALS:
+            self.current += 1
+            return self.Literal(KEYWORD_LITERALS[type])
+        if type is TokenType.LEFT_PAREN:
+            self.current += 1
             expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression")
-            return Grouping(expr)
+            return self.Grouping(expr)
         
         raise self.error(self.peek(), "Expected Expression")
     
-    def match(self, types):
-        for type in types:
-            if self.check(type):
-                self.advance()
-                return True
+    # EOF is never passed in, so a match can't step past the end.
+    def match(self, type: TokenType):
+        if self.tokens[self.current].type is type:
+            self.current += 1
+            return True
         return False
     
     def consume(self, type: TokenType, message: str):
@@ -295,9 +332,7 @@ class Parser():
         raise self.error(self.peek(), message)
     
     def check(self, type: TokenType):
-        if self.isAtEnd():
-            return False
-        return self.peek().type == type
+        return self.tokens[self.current].type is type
     
     def advance(self):
         if not self.isAtEnd():
@@ -325,7 +360,7 @@ class Parser():
             if self.previous().type == TokenType.SEMICOLON:
                 return
             
-            if self.peek().type in set([TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN]):
+            if self.peek().type in SYNC_TYPES:
                 return
             
             self.advance()
@@ -0,0 +1,315 @@
+import sys
+import threading
+from time import perf_counter
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+from Interpreter import Interpreter
+from LoxCallable import LoxFunction
+
+PROFILE_MODES = ('trace', 'sample')
+# Label of the frame running top-level statements
+SCRIPT = "<script>"
+# Number of hottest lines in the report
+REPORT_LINES = 20
+
+# Finds the source line of a statement from the first token it carries.
+# Statements made only of literals have none.
+class LineFinder(Expr.Visitor, Stmt.Visitor):
+    def __init__(self):
+        self.lines = {}
+
+    def find(self, stmt: Stmt):
+        if stmt in self.lines:
+            return self.lines[stmt]
+        line = stmt.accept(self)
+        self.lines[stmt] = line
+        return line
+
+    def visitAssignExpr(self, Expr: Assign):
+        return Expr.name.line
+
+    def visitBinaryExpr(self, Expr: Binary):
+        line = Expr.left.accept(self)
+        return Expr.operator.line if line is None else line
+
+    def visitCallExpr(self, Expr: Call):
+        line = Expr.callee.accept(self)
+        return Expr.paren.line if line is None else line
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        return Expr.expression.accept(self)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return None
+
+    def visitLogicalExpr(self, Expr: Logical):
+        line = Expr.left.accept(self)
+        return Expr.operator.line if line is None else line
+
+    def visitUnaryExpr(self, Expr: Unary):
+        return Expr.operator.line
+
+    def visitVariableExpr(self, Expr: Variable):
+        return Expr.name.line
+
+    def visitBlockStmt(self, Stmt: Block):
+        for statement in Stmt.statements:
+            line = self.find(statement)
+            if line is not None:
+                return line
+        return None
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        return Stmt.expression.accept(self)
+
+    def visitFunctionStmt(self, Stmt: Function):
+        return Stmt.name.line
+
+    def visitIfStmt(self, Stmt: If):
+        return Stmt.condition.accept(self)
+
+    def visitPrintStmt(self, Stmt: Print):
+        return Stmt.expression.accept(self)
+
+    def visitReturnStmt(self, Stmt: Return):
+        return Stmt.keyword.line
+
+    def visitVarStmt(self, Stmt: Var):
+        return Stmt.name.line
+
+    def visitWhileStmt(self, Stmt: While):
+        return Stmt.condition.accept(self)
+
+# Per-function and per-line costs of a run. Functions are labelled name:line
+# of their declaration. Costs are seconds for TracingProfiler and samples for
+# SamplingProfiler; stacks maps each semicolon separated call stack to the
+# cost spent in its innermost function, the collapsed format flame graph
+# tools read.
+class Profiler:
+    def __init__(self):
+        self.lines = LineFinder()
+        self.calls = {}
+        self.selfCost = {}
+        self.totalCost = {}
+        self.lineHits = {}
+        self.lineCost = {}
+        self.stacks = {}
+        self.elapsed = 0.0
+        self.started = 0.0
+
+    def label(self, declaration: Function):
+        return declaration.name.lexeme + ":" + str(declaration.name.line)
+
+    def add(self, costs, key, cost):
+        costs[key] = costs.get(key, 0) + cost
+
+    # Milliseconds per unit of cost
+    def scale(self):
+        return 1000.0
+
+    # Integer weight of a cost in the collapsed stacks file
+    def weight(self, cost):
+        return round(cost * 1e6)
+
+    def report(self):
+        scale = self.scale()
+        lines = ["[profile] " + self.mode + ", " + str(round(self.elapsed * 1000, 1)) + " ms"]
+        lines.append("function".ljust(24) + "calls".rjust(10) + "self ms".rjust(12) + "total ms".rjust(12))
+        for label in sorted(self.selfCost, key=self.selfCost.get, reverse=True):
+            calls = str(self.calls[label]) if label in self.calls else "-"
+            lines.append(label.ljust(24) + calls.rjust(10) +
+                         str(round(self.selfCost[label] * scale, 1)).rjust(12) +
+                         str(round(self.totalCost.get(label, 0) * scale, 1)).rjust(12))
+        lines.append("line".ljust(24) + "hits".rjust(10) + "self ms".rjust(12))
+        for line in sorted(self.lineCost, key=self.lineCost.get, reverse=True)[:REPORT_LINES]:
+            hits = str(self.lineHits[line]) if line in self.lineHits else "-"
+            lines.append(str(line).ljust(24) + hits.rjust(10) + str(round(self.lineCost[line] * scale, 1)).rjust(12))
+        return "\n".join(lines)
+
+    def writeStacks(self, path):
+        with open(path, 'w') as f:
+            for stack, cost in self.stacks.items():
+                weight = self.weight(cost)
+                if weight > 0:
+                    f.write(stack + " " + str(weight) + "\n")
+
+# Deterministic profiler: TracingInterpreter reports every statement and
+# function body it runs, and the time between two reports is charged to the
+# innermost function and line. Exact counts, but the hooks slow the run down.
+class TracingProfiler(Profiler):
+    mode = "trace"
+
+    def __init__(self):
+        super().__init__()
+        # id of a function body -> label of its function
+        self.bodies = {}
+        # (label, stack, start time) of each running function
+        self.frames = []
+        # Number of frames of each function on the stack, so recursion
+        # isn't counted twice in its total time
+        self.active = {}
+        self.lineStack = []
+        self.last = 0.0
+
+    def createInterpreter(self):
+        return TracingInterpreter(self)
+
+    def start(self):
+        self.started = self.last = perf_counter()
+        self.enterFunction(SCRIPT)
+
+    def stop(self):
+        self.exitFunction()
+        self.elapsed += perf_counter() - self.started
+
+    def declare(self, declaration: Function):
+        self.bodies[id(declaration.body)] = self.label(declaration)
+
+    def charge(self):
+        now = perf_counter()
+        elapsed = now - self.last
+        self.last = now
+        label, stack, start = self.frames[-1]
+        self.add(self.selfCost, label, elapsed)
+        self.add(self.stacks, stack, elapsed)
+        if self.lineStack:
+            self.add(self.lineCost, self.lineStack[-1], elapsed)
+        return now
+
+    def enterFunction(self, label: str):
+        now = self.charge() if self.frames else self.last
+        stack = self.frames[-1][1] + ";" + label if self.frames else label
+        self.frames.append((label, stack, now))
+        self.add(self.calls, label, 1)
+        self.add(self.active, label, 1)
+
+    def exitFunction(self):
+        now = self.charge()
+        label, stack, start = self.frames.pop()
+        self.active[label] -= 1
+        if self.active[label] == 0:
+            self.add(self.totalCost, label, now - start)
+
+    def enterLine(self, stmt: Stmt):
+        self.charge()
+        if type(stmt) is Block:
+            # Blocks are charged to the line they are nested in, the
+            # statements inside count their own hits
+            self.lineStack.append(self.lineStack[-1] if self.lineStack else 0)
+            return
+        line = self.lines.find(stmt)
+        if line is None:
+            line = self.lineStack[-1] if self.lineStack else 0
+        self.lineStack.append(line)
+        self.add(self.lineHits, line, 1)
+
+    def exitLine(self):
+        self.charge()
+        self.lineStack.pop()
+
+class TracingInterpreter(Interpreter):
+    def __init__(self, profiler: TracingProfiler):
+        super().__init__()
+        self.profiler = profiler
+
+    def execute(self, stmt: Stmt):
+        self.profiler.enterLine(stmt)
+        try:
+            return stmt.accept(self)
+        finally:
+            self.profiler.exitLine()
+
+    def executeBlock(self, statements, environment):
+        label = self.profiler.bodies.get(id(statements))
+        if label is None:
+            return super().executeBlock(statements, environment)
+        # A function body, entered once per call including tail calls
+        self.profiler.enterFunction(label)
+        try:
+            return super().executeBlock(statements, environment)
+        finally:
+            self.profiler.exitFunction()
+
+    def visitFunctionStmt(self, Stmt: Function):
+        self.profiler.declare(Stmt)
+        super().visitFunctionStmt(Stmt)
+
+# Statistical profiler: a background thread wakes up every interval seconds
+# and walks the Python stack of the interpreting thread. Each LoxFunction.call
+# frame is a Lox call and the innermost Interpreter.execute frame holds the
+# running statement. The interpreter runs unmodified, so the overhead is
+# one stack walk per sample, but there are no call counts and short
+# functions may be missed.
+class SamplingProfiler(Profiler):
+    mode = "sample"
+    CALL = LoxFunction.call.__code__
+    EXECUTE = Interpreter.execute.__code__
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.thread = None
+        self.switchInterval = None
+
+    def createInterpreter(self):
+        return Interpreter()
+
+    def start(self):
+        self.thread = threading.get_ident()
+        self.stopped.clear()
+        # The sampler needs the GIL to run, which the interpreting thread
+        # only offers every switch interval
+        self.switchInterval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switchInterval, self.interval))
+        self.sampler = threading.Thread(target=self.run, daemon=True)
+        self.started = perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.elapsed += perf_counter() - self.started
+        self.stopped.set()
+        self.sampler.join()
+        sys.setswitchinterval(self.switchInterval)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame):
+        labels = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is self.CALL:
+                frameLocals = frame.f_locals
+                # function is the callee of the tail call the frame is running
+                function = frameLocals.get('function', frameLocals['self'])
+                labels.append(self.label(function.declaration))
+            elif code is self.EXECUTE and line is None:
+                line = self.lines.find(frame.f_locals['stmt'])
+            frame = frame.f_back
+        if not labels and line is None:
+            # Not interpreting yet or anymore
+            return
+
+        labels.append(SCRIPT)
+        labels.reverse()
+        self.samples += 1
+        self.add(self.selfCost, labels[-1], 1)
+        for label in set(labels):
+            self.add(self.totalCost, label, 1)
+        self.add(self.stacks, ";".join(labels), 1)
+        self.add(self.lineCost, 0 if line is None else line, 1)
+
+    def scale(self):
+        if self.samples == 0:
+            return 0.0
+        return self.elapsed * 1000.0 / self.samples
+
+    def weight(self, cost):
+        return cost
@@ -0,0 +1,156 @@
+from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logical, Call
+from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
+
+# Finds top-level functions whose result depends only on their arguments, so
+# calls to them can be memoized. Runs on resolved trees. A function is pure
+# when its body
+#   - doesn't print or declare nested functions,
+#   - only reads and assigns its own parameters and locals,
+#   - only calls other pure functions or pure natives by their global name,
+# and its global name is declared once and never assigned, so calls by that
+# name always reach the same function.
+class PurityAnalyzer(Expr.Visitor, Stmt.Visitor):
+    def __init__(self, natives=frozenset()):
+        # Names of the pure natives, see NativeRegistry.pureNames
+        self.natives = natives
+        self.declarations = {}
+        self.rebound = set()
+        self.calls = {}
+        self.current = None
+        self.impure = False
+        # Scopes opened inside the current function, its parameters included
+        self.scopeDepth = 0
+
+    def analyze(self, statements):
+        for statement in statements:
+            if type(statement) == Function:
+                if statement.name.lexeme in self.declarations:
+                    self.rebound.add(statement.name.lexeme)
+                self.declarations[statement.name.lexeme] = statement
+            elif type(statement) == Var:
+                self.rebound.add(statement.name.lexeme)
+
+        for statement in statements:
+            if type(statement) == Function:
+                self.analyzeFunction(statement)
+            else:
+                self.visit(statement)
+
+        # Drop functions calling anything impure until nothing changes
+        natives = self.natives - self.rebound - self.declarations.keys()
+        pure = {name for name in self.calls if name not in self.rebound}
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not self.calls[name] <= pure | natives:
+                    pure.discard(name)
+                    changed = True
+
+        return {self.declarations[name] for name in pure}
+
+    def analyzeFunction(self, function: Function):
+        self.current = function
+        self.impure = False
+        self.scopeDepth = 1
+        self.calls[function.name.lexeme] = set()
+        self.visitAll(function.body)
+        if self.impure:
+            del self.calls[function.name.lexeme]
+        self.current = None
+        self.scopeDepth = 0
+
+    def visit(self, node):
+        if node is not None:
+            node.accept(self)
+
+    def visitAll(self, nodes):
+        for node in nodes:
+            self.visit(node)
+
+    def isGlobalFunction(self, Expr: Variable):
+        return Expr.name.lexeme in self.declarations or Expr.name.lexeme in self.natives
+
+    def isLocal(self, Expr: Expr):
+        return Expr.depth is not None and Expr.depth < self.scopeDepth
+
+    def visitAssignExpr(self, Expr: Assign):
+        self.visit(Expr.value)
+        if Expr.depth is None:
+            self.rebound.add(Expr.name.lexeme)
+        if self.current is not None and not self.isLocal(Expr):
+            self.impure = True
+
+    def visitBinaryExpr(self, Expr: Binary):
+        self.visit(Expr.left)
+        self.visit(Expr.right)
+
+    def visitCallExpr(self, Expr: Call):
+        callee = Expr.callee
+        if self.current is not None:
+            if type(callee) == Variable and callee.depth is None and self.isGlobalFunction(callee):
+                self.calls[self.current.name.lexeme].add(callee.name.lexeme)
+            else:
+                self.impure = True
+        if type(callee) != Variable:
+            self.visit(callee)
+        self.visitAll(Expr.arguments)
+
+    def visitGroupingExpr(self, Expr: Grouping):
+        self.visit(Expr.expression)
+
+    def visitLiteralExpr(self, Expr: Literal):
+        return
+
+    def visitLogicalExpr(self, Expr: Logical):
+        self.visit(Expr.left)
+        self.visit(Expr.right)
+
+    def visitUnaryExpr(self, Expr: Unary):
+        self.visit(Expr.right)
+
+    def visitVariableExpr(self, Expr: Variable):
+        if self.current is None or self.isLocal(Expr):
+            return
+        if Expr.depth is None and self.isGlobalFunction(Expr):
+            # Referring to a function without calling it is fine if it is pure
+            self.calls[self.current.name.lexeme].add(Expr.name.lexeme)
+            return
+        self.impure = True
+
+    def visitBlockStmt(self, Stmt: Block):
+        self.scopeDepth += 1
+        self.visitAll(Stmt.statements)
+        self.scopeDepth -= 1
+
+    def visitExpressionStmt(self, Stmt: Expression):
+        self.visit(Stmt.expression)
+
+    def visitFunctionStmt(self, Stmt: Function):
+        # Nested functions are never memoized and make the enclosing one
+        # impure, but assignments inside them can still rebind globals.
+        if self.current is not None:
+            self.impure = True
+        self.scopeDepth += 1
+        self.visitAll(Stmt.body)
+        self.scopeDepth -= 1
+
+    def visitIfStmt(self, Stmt: If):
+        self.visit(Stmt.condition)
+        self.visit(Stmt.thenBranch)
+        self.visit(Stmt.elseBranch)
+
+    def visitPrintStmt(self, Stmt: Print):
+        if self.current is not None:
+            self.impure = True
+        self.visit(Stmt.expression)
+
+    def visitReturnStmt(self, Stmt: Return):
+        self.visit(Stmt.value)
+
+    def visitVarStmt(self, Stmt: Var):
+        self.visit(Stmt.initializer)
+
+    def visitWhileStmt(self, Stmt: While):
+        self.visit(Stmt.condition)
+        self.visit(Stmt.body)
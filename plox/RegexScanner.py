@@ -0,0 +1,102 @@
+import re
+import sys
+from Token import Token, TokenType, KEYWORDS
+from LoxError import LoxError
+
+# Leading blanks are consumed as part of each match, then exactly one
+# alternative applies. The final catch-all makes finditer visit every
+# non-blank character so unexpected ones are reported instead of skipped.
+TOKEN_PATTERN = re.compile(r'''
+    [ \r\t]*
+    (?:
+        ([A-Za-z_][A-Za-z_0-9]*)          # 1 identifier or keyword
+      | ([(){},.\-+;*]|[!=<>]=?)          # 2 operator
+      | (\n)                              # 3 newline
+      | ([0-9]+(?:\.[0-9]+)?)             # 4 number
+      | (//[^\n]*|/)                      # 5 comment or slash
+      | ("[^"]*")                         # 6 string
+      | (")                               # 7 unterminated string
+      | ([^ \r\t])                        # 8 unexpected character
+    )
+''', re.VERBOSE | re.DOTALL)
+
+OPERATORS = {
+    type.value: type for type in TokenType
+    if type.value in ('(', ')', '{', '}', ',', '.', '-', '+', ';', '/', '*',
+                      '!', '!=', '=', '==', '>', '>=', '<', '<=')
+}
+
+class RegexScanner:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = []
+        self.line = 1
+        self.pending = ""
+
+    def scanTokens(self):
+        self.tokens.extend(self.scanText(self.source))
+        if self.pending:
+            self.line += self.pending.count('\n')
+            LoxError.error(self.line, "Unterminated string.")
+        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+
+    # Yields the tokens in text. An unterminated string stops the scan and
+    # is left in self.pending, since in streaming mode its closing quote
+    # may still be in input that has not been read yet.
+    def scanText(self, text: str):
+        line = self.line
+        keywords = KEYWORDS
+        operators = OPERATORS
+        IDENTIFIER = TokenType.IDENTIFIER
+        NUMBER = TokenType.NUMBER
+        STRING = TokenType.STRING
+        SLASH = TokenType.SLASH
+        intern = sys.intern
+
+        for match in TOKEN_PATTERN.finditer(text):
+            kind = match.lastindex
+            if kind == 1:
+                lexeme = intern(match.group(1))
+                yield Token(keywords.get(lexeme, IDENTIFIER), lexeme, None, line)
+            elif kind == 2:
+                lexeme = match.group(2)
+                yield Token(operators[lexeme], lexeme, None, line)
+            elif kind == 3:
+                line += 1
+            elif kind == 4:
+                lexeme = match.group(4)
+                yield Token(NUMBER, lexeme, float(lexeme), line)
+            elif kind == 5:
+                if match.group(5) == '/':
+                    yield Token(SLASH, '/', None, line)
+            elif kind == 6:
+                lexeme = match.group(6)
+                line += lexeme.count('\n')
+                yield Token(STRING, lexeme, lexeme[1:-1], line)
+            elif kind == 7:
+                self.pending = text[match.start(7):]
+                break
+            elif kind == 8:
+                self.line = line
+                LoxError.error(line, "Unexpecter Character.")
+
+        self.line = line
+
+class StreamScanner(RegexScanner):
+    def __init__(self, lines):
+        super().__init__("")
+        # Any iterable of text chunks that end on line boundaries, e.g. an open file.
+        self.lines = lines
+
+    def scanTokens(self):
+        for chunk in self.lines:
+            if self.pending:
+                chunk = self.pending + chunk
+                self.pending = ""
+            yield from self.scanText(chunk)
+
+        if self.pending:
+            self.line += self.pending.count('\n')
+            LoxError.error(self.line, "Unterminated string.")
+        yield Token(TokenType.EOF, "", None, self.line)
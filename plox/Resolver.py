@@ -2,7 +2,7 @@ from Expr import Expr, Grouping, Literal, Unary, Binary, Assign, Variable, Logic
 from Stmt import Stmt, Print, Expression, Block, Var, If, While, Function, Return
 from Token import Token
 from LoxError import LoxError
-from Interpreter import Interpreter
+from Operators import BINARY_OPERATORS, UNARY_OPERATORS
 from enum import Enum
 
 class FunctionType(Enum):
@@ -10,9 +10,9 @@ class FunctionType(Enum):
     FUNCTION = "function"
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    def __init__(self, interpreter: Interpreter):
-        self.interpreter = interpreter
+    def __init__(self):
         self.scopes = []
+        self.slots = []
         self.currentFunction = FunctionType.NONE
         self.hadError = False
 
@@ -40,9 +40,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
     
     def beginScope(self):
         self.scopes.append({})
+        self.slots.append({})
     
     def endScope(self):
         self.scopes.pop()
+        self.slots.pop()
 
     def declare(self, name: Token):
         if len(self.scopes) == 0:
@@ -52,11 +54,15 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             self.hadError = True
             LoxError.errorToken(name, "Already a variable with this in this scope.")
         scope[name.lexeme] = False
+        slots = self.slots[-1]
+        if name.lexeme not in slots:
+            slots[name.lexeme] = len(slots)
 
     def resolveLocal(self, Expr: Expr, name: Token):
         for i in reversed(range(len(self.scopes))):
             if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(Expr, len(self.scope) - 1 - i)
+                Expr.depth = len(self.scopes) - 1 - i
+                Expr.slot = self.slots[i][name.lexeme]
                 return
     
     def define(self, name: Token):
@@ -118,6 +124,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.resolveLocal(Expr, Expr.name)
     
     def visitBinaryExpr(self, Expr: Binary):
+        Expr.operation = BINARY_OPERATORS[Expr.operator.type]
         self.resolveExpr(Expr.left)
         self.resolveExpr(Expr.right)
 
@@ -138,4 +145,5 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.resolveExpr(Expr.right)
     
     def visitUnaryExpr(self, Expr: Unary):
+        Expr.operation = UNARY_OPERATORS[Expr.operator.type]
         self.resolveExpr(Expr.right)
\ No newline at end of file
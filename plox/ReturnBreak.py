@@ -1,3 +0,0 @@
-class ReturnBreak(RuntimeError):
-    def __init__(self, value):
-        self.value = value
\ No newline at end of file
@@ -1,3 +1,4 @@
+import sys
 from Token import Token, TokenType, KEYWORDS
 from LoxError import LoxError
 
@@ -98,11 +99,10 @@ class Scanner:
         while self.isAlphaNumeric(self.peek()):
             self.advance()
         
-        text = self.source[self.start:self.current]
-        if text in KEYWORDS:
-            self.addToken(KEYWORDS[text])
-        else:
-            self.addToken(TokenType.IDENTIFIER)
+        # Interned so every occurrence of a name shares one string and
+        # dict lookups on it in the Resolver and environments hit on identity.
+        text = sys.intern(self.source[self.start:self.current])
+        self.tokens.append(Token(KEYWORDS.get(text, TokenType.IDENTIFIER), text, None, self.line))
     
     def addToken(self, type: TokenType):
         self.addTokenWithLiteral(type, None)
@@ -1,44 +1,37 @@
 # Generated by tool/GenerateAst.py
-from abc import ABC, abstractmethod
 from Expr import Expr
 from Token import Token
 
-class Stmt(ABC):
-    class Visitor(ABC):
-        @abstractmethod
+class Stmt:
+    __slots__ = ()
+
+    class Visitor:
         def visitBlockStmt(self, Stmt: 'Block'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitExpressionStmt(self, Stmt: 'Expression'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitFunctionStmt(self, Stmt: 'Function'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitIfStmt(self, Stmt: 'If'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitPrintStmt(self, Stmt: 'Print'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitReturnStmt(self, Stmt: 'Return'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitVarStmt(self, Stmt: 'Var'):
-            pass
+            raise NotImplementedError
 
-        @abstractmethod
         def visitWhileStmt(self, Stmt: 'While'):
-            pass
+            raise NotImplementedError
 
 class Block(Stmt):
-    statements = None
+    __slots__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
 
@@ -46,7 +39,7 @@ class Block(Stmt):
         return visitor.visitBlockStmt(self)
 
 class Expression(Stmt):
-    expression = None
+    __slots__ = ('expression',)
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -54,9 +47,7 @@ class Expression(Stmt):
         return visitor.visitExpressionStmt(self)
 
 class Function(Stmt):
-    name = None
-    params = None
-    body = None
+    __slots__ = ('name', 'params', 'body')
     def __init__(self, name: Token, params, body):
         self.name = name
         self.params = params
@@ -66,9 +57,7 @@ class Function(Stmt):
         return visitor.visitFunctionStmt(self)
 
 class If(Stmt):
-    condition = None
-    thenBranch = None
-    elseBranch = None
+    __slots__ = ('condition', 'thenBranch', 'elseBranch')
     def __init__(self, condition: Expr, thenBranch: Stmt, elseBranch: Stmt):
         self.condition = condition
         self.thenBranch = thenBranch
@@ -78,7 +67,7 @@ class If(Stmt):
         return visitor.visitIfStmt(self)
 
 class Print(Stmt):
-    expression = None
+    __slots__ = ('expression',)
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -86,8 +75,7 @@ class Print(Stmt):
         return visitor.visitPrintStmt(self)
 
 class Return(Stmt):
-    keyword = None
-    value = None
+    __slots__ = ('keyword', 'value')
     def __init__(self, keyword: Token, value: Expr):
         self.keyword = keyword
         self.value = value
@@ -96,8 +84,7 @@ class Return(Stmt):
         return visitor.visitReturnStmt(self)
 
 class Var(Stmt):
-    name = None
-    initializer = None
+    __slots__ = ('name', 'initializer')
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
@@ -106,8 +93,7 @@ class Var(Stmt):
         return visitor.visitVarStmt(self)
 
 class While(Stmt):
-    condition = None
-    body = None
+    __slots__ = ('condition', 'body')
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
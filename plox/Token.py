@@ -49,6 +49,10 @@ class TokenType(Enum):
 
     EOF = 'EOF'
 
+    # Members are singletons, so identity hashing is enough and avoids the
+    # Python-level Enum.__hash__ on every set and dict lookup.
+    __hash__ = object.__hash__
+
 KEYWORDS = {
     "and": TokenType.AND,
     "class": TokenType.CLASS,
@@ -69,6 +73,8 @@ KEYWORDS = {
 }
 
 class Token:
+    __slots__ = ('type', 'lexeme', 'literal', 'line')
+
     def __init__(self, type: TokenType, lexeme: str, literal, line: int):
         self.type = type
         self.lexeme = lexeme
@@ -0,0 +1,22 @@
+# Lets the Parser index into a lazily produced token sequence. The Parser
+# only ever looks at the current and previous token, so everything older
+# is dropped once the window grows past WINDOW_MAX.
+WINDOW_MAX = 256
+
+class TokenStream:
+    def __init__(self, tokens):
+        self.iterator = iter(tokens)
+        self.window = []
+        self.base = 0
+
+    def __getitem__(self, index: int):
+        offset = index - self.base
+        window = self.window
+        while offset >= len(window):
+            window.append(next(self.iterator))
+
+        if offset > WINDOW_MAX:
+            del window[:offset - 1]
+            self.base += offset - 1
+            offset = 1
+        return window[offset]
@@ -0,0 +1,329 @@
+from Chunk import OpCode
+from Compiler import Compiler, FunctionProto
+from RuntimeErr import RuntimeErr
+from LoxError import LoxError
+from LoxCallable import LoxCallable
+from Natives import NATIVES, NativeError
+from Operators import add, subtract, multiply, divide, greater, greaterEqual, less, lessEqual, negate
+
+FRAMES_MAX = 10000
+
+class Upvalue:
+    __slots__ = ('cells', 'index')
+
+    def __init__(self, cells, index: int):
+        self.cells = cells
+        self.index = index
+
+    def close(self):
+        self.cells = [self.cells[self.index]]
+        self.index = 0
+
+class Closure(LoxCallable):
+    def __init__(self, function: FunctionProto, upvalues):
+        self.function = function
+        self.upvalues = upvalues
+
+    def call(self, interpreter, arguments):
+        return interpreter.callClosure(self, arguments)
+
+    def arity(self):
+        return self.function.arity
+
+    def __str__(self):
+        return str(self.function)
+
+class VM:
+    def __init__(self, output=None):
+        self.output = output
+        self.hadRuntimeError = False
+        self.globals = {}
+        NATIVES.install(self.globals.__setitem__)
+
+    def interpret(self, statements):
+        function = Compiler().compile(statements)
+        try:
+            self.callClosure(Closure(function, []), [])
+        except RuntimeErr as err:
+            self.hadRuntimeError = True
+            LoxError.runtimeError(err, self.output)
+
+    def callClosure(self, closure: Closure, arguments):
+        return self.run(closure, list(arguments))
+
+    def error(self, function: FunctionProto, ip: int, message: str):
+        return RuntimeErr(function.chunk.tokens[ip - 1], message)
+
+    def stringify(self, object):
+        if object is None:
+            return "nil"
+        if type(object) == float:
+            text = str(object)
+            if text.endswith('.0'):
+                text = text[:-2]
+            return text
+        return str(object)
+
+    def run(self, closure: Closure, slots):
+        CONSTANT = OpCode.CONSTANT.value
+        NIL = OpCode.NIL.value
+        TRUE = OpCode.TRUE.value
+        FALSE = OpCode.FALSE.value
+        POP = OpCode.POP.value
+        GET_LOCAL = OpCode.GET_LOCAL.value
+        SET_LOCAL = OpCode.SET_LOCAL.value
+        STORE_LOCAL = OpCode.STORE_LOCAL.value
+        GET_GLOBAL = OpCode.GET_GLOBAL.value
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+        SET_GLOBAL = OpCode.SET_GLOBAL.value
+        GET_UPVALUE = OpCode.GET_UPVALUE.value
+        SET_UPVALUE = OpCode.SET_UPVALUE.value
+        EQUAL = OpCode.EQUAL.value
+        NOT_EQUAL = OpCode.NOT_EQUAL.value
+        GREATER = OpCode.GREATER.value
+        GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+        LESS = OpCode.LESS.value
+        LESS_EQUAL = OpCode.LESS_EQUAL.value
+        ADD = OpCode.ADD.value
+        SUBTRACT = OpCode.SUBTRACT.value
+        MULTIPLY = OpCode.MULTIPLY.value
+        DIVIDE = OpCode.DIVIDE.value
+        NOT = OpCode.NOT.value
+        NEGATE = OpCode.NEGATE.value
+        PRINT = OpCode.PRINT.value
+        JUMP = OpCode.JUMP.value
+        POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE.value
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE.value
+        CALL = OpCode.CALL.value
+        CLOSURE = OpCode.CLOSURE.value
+        CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE.value
+        RETURN = OpCode.RETURN.value
+
+        globals = self.globals
+        frames = []
+        function = closure.function
+        code = function.chunk.code
+        constants = function.chunk.constants
+        upvalues = closure.upvalues
+        if len(slots) < function.slotCount:
+            slots.extend([None] * (function.slotCount - len(slots)))
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        openUpvalues = None
+        ip = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                push(slots[code[ip]])
+                ip += 1
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals:
+                    raise self.error(function, ip, "Undefined variable '" + name + "'.")
+                push(globals[name])
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                else:
+                    stack[-1] = add(function.chunk.tokens[ip - 1], left, right)
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = subtract(function.chunk.tokens[ip - 1], left, right)
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = less(function.chunk.tokens[ip - 1], left, right)
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == CALL:
+                argCount = code[ip]
+                ip += 1
+                callee = stack[-1 - argCount]
+                if type(callee) is Closure:
+                    callFunction = callee.function
+                    if argCount != callFunction.arity:
+                        raise self.error(function, ip, "Expected " + str(callFunction.arity) + " arguments but got " + str(argCount) + " instead.")
+                    if len(frames) == FRAMES_MAX:
+                        raise self.error(function, ip, "Stack overflow.")
+                    if argCount == 0:
+                        arguments = []
+                    else:
+                        arguments = stack[-argCount:]
+                    del stack[-1 - argCount:]
+                    frames.append((closure, function, code, constants, upvalues, slots, stack, openUpvalues, ip))
+
+                    closure = callee
+                    function = callFunction
+                    code = function.chunk.code
+                    constants = function.chunk.constants
+                    upvalues = closure.upvalues
+                    slots = arguments
+                    if argCount < function.slotCount:
+                        slots.extend([None] * (function.slotCount - argCount))
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    openUpvalues = None
+                    ip = 0
+                elif isinstance(callee, LoxCallable):
+                    arguments = stack[len(stack) - argCount:]
+                    if argCount != callee.arity():
+                        raise self.error(function, ip, "Expected " + str(callee.arity()) + " arguments but got " + str(argCount) + " instead.")
+                    del stack[-1 - argCount:]
+                    try:
+                        push(callee.call(self, arguments))
+                    except NativeError as err:
+                        raise self.error(function, ip, err.message)
+                else:
+                    raise self.error(function, ip, "Can only call functions and classes")
+            elif op == RETURN:
+                result = pop()
+                if openUpvalues is not None:
+                    for upvalue in openUpvalues.values():
+                        upvalue.close()
+                if len(frames) == 0:
+                    return result
+                closure, function, code, constants, upvalues, slots, stack, openUpvalues, ip = frames.pop()
+                push = stack.append
+                pop = stack.pop
+                push(result)
+            elif op == STORE_LOCAL:
+                slots[code[ip]] = pop()
+                ip += 1
+            elif op == SET_LOCAL:
+                slots[code[ip]] = stack[-1]
+                ip += 1
+            elif op == POP:
+                pop()
+            elif op == JUMP:
+                ip = code[ip]
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = multiply(function.chunk.tokens[ip - 1], left, right)
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left / right
+                else:
+                    stack[-1] = divide(function.chunk.tokens[ip - 1], left, right)
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = greater(function.chunk.tokens[ip - 1], left, right)
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = greaterEqual(function.chunk.tokens[ip - 1], left, right)
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = lessEqual(function.chunk.tokens[ip - 1], left, right)
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not (stack[-1] == right)
+            elif op == GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                push(upvalue.cells[upvalue.index])
+            elif op == SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                upvalue.cells[upvalue.index] = stack[-1]
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals:
+                    raise self.error(function, ip, "Undefined variable '" + name + "'.")
+                globals[name] = stack[-1]
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                value = stack[-1]
+                if type(value) is float:
+                    stack[-1] = -value
+                else:
+                    stack[-1] = negate(function.chunk.tokens[ip - 1], value)
+            elif op == PRINT:
+                print(self.stringify(pop()), file=self.output)
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+            elif op == CLOSURE:
+                proto = constants[code[ip]]
+                ip += 1
+                captured = []
+                for i in range(proto.upvalueCount):
+                    isLocal = code[ip]
+                    index = code[ip + 1]
+                    ip += 2
+                    if isLocal:
+                        if openUpvalues is None:
+                            openUpvalues = {}
+                        if index not in openUpvalues:
+                            openUpvalues[index] = Upvalue(slots, index)
+                        captured.append(openUpvalues[index])
+                    else:
+                        captured.append(upvalues[index])
+                push(Closure(proto, captured))
+            elif op == CLOSE_UPVALUE:
+                if openUpvalues is not None and code[ip] in openUpvalues:
+                    openUpvalues.pop(code[ip]).close()
+                ip += 1
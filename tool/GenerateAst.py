@@ -5,20 +5,22 @@ class GenerateAst:
     
     @staticmethod
     def main():
-        parser = argparse.ArgumentParser(usage="Usage: python GenerateAst.py <output directory>")
+        parser = argparse.ArgumentParser(usage="Usage: python GenerateAst.py [--slots] <output directory>")
         parser.add_argument('f', type=str, help="Provide a valid directory path")
+        parser.add_argument('--slots', action='store_true', help="Emit __slots__ node classes without a per-instance __dict__")
         args = parser.parse_args()
         outputDir = args.f
+        slots = args.slots
         GenerateAst.defineAst(outputDir, "Expr", [
-            "Assign     -> name: Token, value: Expr",
-            "Binary     -> left: Expr, operator: Token, right: Expr",
-            "Call       -> callee: Expr, paren: Token, arguments",
+            "Assign     -> name: Token, value: Expr | depth, slot, cell, version",
+            "Binary     -> left: Expr, operator: Token, right: Expr | operation",
+            "Call       -> callee: Expr, paren: Token, arguments | function",
             "Grouping   -> expression: Expr",
             "Literal    -> value",
             "Logical    -> left: Expr, operator: Token, right: Expr",
-            "Unary      -> operator: Token, right: Expr",
-            "Variable   -> name: Token"
-        ])
+            "Unary      -> operator: Token, right: Expr | operation",
+            "Variable   -> name: Token | depth, slot, cell, version"
+        ], slots)
 
         GenerateAst.defineAst(outputDir, "Stmt", [
             "Block      -> statements",
@@ -29,39 +31,58 @@ class GenerateAst:
             "Return     -> keyword: Token, value: Expr",
             "Var        -> name: Token, initializer: Expr",
             "While      -> condition: Expr, body: Stmt"
-        ])
+        ], slots)
     
     @staticmethod
-    def defineAst(outputDir: str, baseName: str, types):
+    def defineAst(outputDir: str, baseName: str, types, slots: bool=False):
         path = Path(outputDir).resolve() / (baseName + '.py')
 
         with open(path, 'w') as file:
             file.write("# Generated by tool/GenerateAst.py\n")
-            file.write("from abc import ABC, abstractmethod\n")
             if baseName != "Expr":
                 file.write("from Expr import Expr\n")
             file.write("from Token import Token\n\n")
-            file.write("class " + baseName + "(ABC):\n")
+            file.write("class " + baseName + ":\n")
+            if slots:
+                file.write("    __slots__ = ()\n\n")
             GenerateAst.defineVisitor(file, baseName, types)
 
             for type in types:
                 parts = type.split('->')
                 className = parts[0].strip()
                 fields = parts[1].strip()
-                GenerateAst.defineType(file, baseName, className, fields)
+                GenerateAst.defineType(file, baseName, className, fields, slots)
     
     @staticmethod
-    def defineType(file, baseName: str, className: str, fieldList: str):
+    def defineType(file, baseName: str, className: str, fieldList: str, slots: bool=False):
         file.write("class " + className + "(" + baseName + "):\n")
 
+        # Fields after '|' are filled in by later passes, not the constructor
+        extraFields = []
+        if '|' in fieldList:
+            parts = fieldList.split('|')
+            fieldList = parts[0].strip()
+            extraFields = parts[1].strip().split(', ')
+
         fields = fieldList.split(', ')
-        # Fields initialize
-        for field in fields:
+        names = []
+        for field in fields + extraFields:
             end = field.find(':')
             name = field
             if end != -1:
                 name = field[:end]
-            file.write("    " + name + " = " + "None\n")
+            names.append(name)
+
+        # Fields initialize
+        if slots:
+            # Slots can't have class level defaults, extra fields are set in __init__ instead
+            quoted = ", ".join("'" + name + "'" for name in names)
+            if len(names) == 1:
+                quoted += ","
+            file.write("    __slots__ = (" + quoted + ")\n")
+        else:
+            for name in names:
+                file.write("    " + name + " = " + "None\n")
 
         # Constructor initialize
         file.write("    def __init__(self, " + fieldList + "):\n")
@@ -71,6 +92,9 @@ class GenerateAst:
             if end != -1:
                 name = field[:end]
             file.write("        self." + name + " = " + name + "\n")
+        if slots:
+            for name in names[len(fields):]:
+                file.write("        self." + name + " = None\n")
         file.write("\n")
         file.write("    def accept(self, visitor):\n")
         file.write("        return visitor.visit" + className + baseName + "(self)\n")
@@ -78,12 +102,13 @@ class GenerateAst:
     
     @staticmethod
     def defineVisitor(file, baseName: str, types):
-        file.write("    class Visitor(ABC):\n")
+        # Plain classes rather than ABCs: ABCMeta slows down importing the
+        # node modules and every isinstance check against them
+        file.write("    class Visitor:\n")
         for type in types:
             typeName = type.split('->')[0].strip()
-            file.write("        @abstractmethod\n")
             file.write("        def visit" + typeName + baseName + "(self, " + baseName + ": '" + typeName + "'):\n")
-            file.write("            pass\n\n")
+            file.write("            raise NotImplementedError\n\n")
         
 
 